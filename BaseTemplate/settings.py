@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
+from mavtournaments.services.sqlite_tuning import apply_profile
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,15 +44,20 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mavtournaments.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'mavtournaments.middleware.ReplicaStickinessMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Server-Timing headers + per-view aggregates at tournaments/debug/timings/
+MAVBRACKET_SERVER_TIMING = os.environ.get('MAVBRACKET_SERVER_TIMING', '') == '1'
+
 ROOT_URLCONF = 'BaseTemplate.urls'
 
 TEMPLATES = [
@@ -83,6 +90,42 @@ DATABASES = {
     }
 }
 
+# "default" = Django's stock SQLite settings; "production" = WAL, busy timeout,
+# tuned pragmas and persistent connections (see mavtournaments/services/sqlite_tuning.py)
+MAVBRACKET_DB_PROFILE = os.environ.get('MAVBRACKET_DB_PROFILE', 'default')
+apply_profile(DATABASES['default'], MAVBRACKET_DB_PROFILE)
+
+# Optional read replica for spectator views (mavtournaments/routers.py). Locally,
+# point this at a second SQLite file and refresh it with `manage.py sync_replica`.
+MAVBRACKET_REPLICA_DB = os.environ.get('MAVBRACKET_REPLICA_DB')
+if MAVBRACKET_REPLICA_DB:
+    DATABASES['replica'] = apply_profile({
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': MAVBRACKET_REPLICA_DB,
+        'TEST': {'MIRROR': 'default'},
+    }, MAVBRACKET_DB_PROFILE)
+DATABASE_ROUTERS = ['mavtournaments.routers.ReplicaRouter']
+MAVBRACKET_REPLICA_STICKY_SECONDS = 10  # read-your-writes window after a change
+
+
+# Cache: per-process memory by default; set MAVBRACKET_CACHE_DIR to share one
+# file-based cache between the worker processes of a host.
+MAVBRACKET_CACHE_DIR = os.environ.get('MAVBRACKET_CACHE_DIR')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mavbracket',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+if MAVBRACKET_CACHE_DIR:
+    CACHES['default'].update(
+        BACKEND='django.core.cache.backends.filebased.FileBasedCache',
+        LOCATION=MAVBRACKET_CACHE_DIR,
+        OPTIONS={'MAX_ENTRIES': 20000},
+    )
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -122,11 +165,25 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = BASE_DIR / 'staticfiles' #for collectstatic
 
+# collectstatic writes content-hashed names plus pre-gzipped copies
+# (see mavtournaments/assets.py); {% static %} resolves to the hashed names
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "mavtournaments.assets.CompressedManifestStaticFilesStorage"},
+}
+
 #Media settings
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT= os.path.join(BASE_DIR, 'media')
 
+# Static bracket snapshots for spectators (mavtournaments/services/snapshots.py):
+# rewritten a moment after results change, servable by any static file server
+MAVBRACKET_SNAPSHOTS = os.environ.get('MAVBRACKET_SNAPSHOTS', '') == '1'
+MAVBRACKET_SNAPSHOT_ROOT = os.path.join(MEDIA_ROOT, 'brackets')
+MAVBRACKET_SNAPSHOT_URL = MEDIA_URL + 'brackets/'
+MAVBRACKET_SNAPSHOT_DEBOUNCE = 2.0  # seconds; a burst of results is written once
+
 #Login settings
 
 LOGIN_URL = 'login'
@@ -1,9 +1,13 @@
 # BaseTemplate/urls.py
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.views.generic import TemplateView
 from django.shortcuts import redirect
 
+from mavtournaments.assets import serve_static
+from mavtournaments.views import bracket_snapshot
+
 def go_home(_request):
     return redirect("tournaments:index")
 
@@ -23,4 +27,11 @@ urlpatterns = [
 
     # App: Tournaments
     path("tournaments/", include(("mavtournaments.urls", "tournaments"), namespace="tournaments")),
+
+    # Collected static files, for deployments without a front-end web server
+    # (runserver's own static handler answers first while DEBUG is on)
+    re_path(r"^%s(?P<path>.+)$" % settings.STATIC_URL.lstrip("/"), serve_static, name="static"),
+
+    # Published bracket snapshots (MAVBRACKET_SNAPSHOTS), for the same deployments
+    re_path(r"^%s(?P<path>.*)$" % settings.MAVBRACKET_SNAPSHOT_URL.lstrip("/"), bracket_snapshot, name="bracket_snapshot"),
 ]
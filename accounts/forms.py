@@ -23,6 +23,15 @@ class UserUpdateForm(forms.ModelForm):
         fields = ['username', 'email']
 
 
+# Avatar upload (profile_edit); thumbnails are built in the background
+class AvatarForm(forms.ModelForm):
+    image = forms.ImageField(required=False)
+
+    class Meta:
+        model = Profile
+        fields = ['image']
+
+
 # Profile update form
 class ProfileUpdateForm(forms.ModelForm):
     class Meta:
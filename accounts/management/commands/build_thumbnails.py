@@ -0,0 +1,26 @@
+# accounts/management/commands/build_thumbnails.py
+from django.core.management.base import BaseCommand
+
+from accounts.models import Profile
+from accounts.thumbnails import build_variants
+
+
+class Command(BaseCommand):
+    help = "Build missing avatar thumbnails (e.g. uploads skipped while the background queue was full)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-check every profile with an image.")
+
+    def handle(self, *args, **opts):
+        qs = Profile.objects.exclude(image="").exclude(image__isnull=True)
+        if not opts["all"]:
+            qs = qs.filter(image_hash="")
+        built = failed = 0
+        for pk in qs.values_list("pk", flat=True).iterator():
+            try:
+                if build_variants(pk):
+                    built += 1
+            except Exception as exc:  # a broken upload shouldn't stop the batch
+                failed += 1
+                self.stderr.write(f"profile {pk}: {exc}")
+        self.stdout.write(f"thumbnailed {built} profiles, {failed} failed")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_profile_bio_profile_first_name_profile_last_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='image_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+    ]
@@ -1,6 +1,33 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+
+class ProfileManager(models.Manager):
+    """
+    Profiles are provisioned lazily: ``for_user`` on first access, or
+    ``ensure_for`` in bulk after ``User.objects.bulk_create`` (which sends no
+    signals). Nothing writes a profile just because a user was saved.
+    """
+
+    def for_user(self, user):
+        profile = user._state.fields_cache.get("profile")
+        if profile is None:
+            profile, _ = self.get_or_create(user=user)
+            user._state.fields_cache["profile"] = profile
+        return profile
+
+    def ensure_for(self, users, batch_size=2000):
+        """Create missing profiles for ``users`` (instances or ids) in bulk."""
+        ids = [getattr(u, "pk", u) for u in users]
+        have = set()
+        for i in range(0, len(ids), batch_size):
+            have.update(self.filter(user_id__in=ids[i:i + batch_size]).values_list("user_id", flat=True))
+        return self.bulk_create(
+            [self.model(user_id=uid) for uid in ids if uid not in have],
+            batch_size=batch_size, ignore_conflicts=True,
+        )
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     image = models.ImageField(upload_to='profile_pics/', default='profile_pics/default.jpg')
@@ -8,9 +35,32 @@ class Profile(models.Model):
     first_name = models.CharField(max_length=50, blank=True, null=True)
     last_name = models.CharField(max_length=50, blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
+    # content hash of ``image`` once its thumbnails exist (see accounts.thumbnails)
+    image_hash = models.CharField(max_length=32, blank=True, default="", editable=False)
+
+    objects = ProfileManager()
 
     def __str__(self):
         return f"{self.user.username}'s profile"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def changed_fields(self):
+        """Names of fields modified since the profile was loaded (all of them if it never was)."""
+        loaded = getattr(self, "_loaded_values", None)
+        fields = [f for f in self._meta.concrete_fields if not f.primary_key]
+        if loaded is None:
+            return [f.name for f in fields]
+        return [f.name for f in fields
+                if f.attname in loaded and getattr(self, f.attname) != loaded[f.attname]]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {f.attname: getattr(self, f.attname) for f in self._meta.concrete_fields}
+
 
 # Create your models here.
@@ -1,14 +1,17 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Profile
 
-@receiver(post_save, sender=User)
-def create_profile(sender, instance, created, **kwargs):
-    if created:
-        Profile.objects.create(user=instance)
+# Profiles are no longer created here: Profile.objects.for_user makes one on
+# first access and Profile.objects.ensure_for covers bulk-created users.
 
 @receiver(post_save, sender=User)
-def save_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
\ No newline at end of file
+def save_profile(sender, instance, update_fields=None, **kwargs):
+    # only a profile already loaded on this instance, and only if it was edited
+    # (a login's last_login update never touches the profile table)
+    profile = instance._state.fields_cache.get("profile")
+    if profile is None or profile.pk is None:
+        return
+    changed = profile.changed_fields()
+    if changed:
+        profile.save(update_fields=changed)
@@ -0,0 +1,35 @@
+from django import template
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.html import format_html
+
+from accounts.thumbnails import SIZES, avatar_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar(user, size="sm"):
+    """
+    Small avatar for ``user``: the WebP/JPEG thumbnail once it exists,
+    otherwise an initials badge. Never the original upload. Select the
+    profile with the user (``select_related("profile")``) to avoid a query
+    per avatar.
+    """
+    try:
+        profile = user.profile
+    except ObjectDoesNotExist:
+        profile = None
+    px = SIZES[size]
+    urls = avatar_urls(profile, size)
+    if urls:
+        return format_html(
+            '<picture><source type="image/webp" srcset="{}">'
+            '<img src="{}" width="{}" height="{}" alt="" class="rounded-circle" loading="lazy"></picture>',
+            urls["webp"], urls["jpg"], px, px,
+        )
+    initials = "".join(part[0] for part in (user.first_name, user.last_name) if part) or user.username[:1]
+    return format_html(
+        '<span class="rounded-circle bg-secondary text-white d-inline-flex align-items-center '
+        'justify-content-center" style="width:{}px;height:{}px;font-size:{}px">{}</span>',
+        px, px, px // 2 - 2, initials.upper(),
+    )
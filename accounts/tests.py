@@ -1,3 +1,94 @@
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from PIL import Image
+
+from .models import Profile
+from .thumbnails import FORMATS, SIZES, THUMB_DIR, build_variants, thumb_name
+
+User = get_user_model()
+
+
+class ProfileProvisioningTests(TestCase):
+    def profile_writes(self, ctx):
+        return [q["sql"] for q in ctx.captured_queries
+                if "accounts_profile" in q["sql"] and not q["sql"].startswith("SELECT")]
+
+    def test_login_writes_no_profile(self):
+        user = User.objects.create_user("alice")
+        Profile.objects.for_user(user)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.force_login(user)
+        self.assertEqual(self.profile_writes(ctx), [])
+
+    def test_saving_a_user_writes_only_edited_profile_fields(self):
+        user = User.objects.create_user("bob")
+        profile = Profile.objects.for_user(user)
+        profile.bio = "Plays support"
+        with CaptureQueriesContext(connection) as ctx:
+            user.save()
+        writes = self.profile_writes(ctx)
+        self.assertEqual(len(writes), 1)
+        self.assertIn('"bio"', writes[0])
+        self.assertNotIn('"image"', writes[0])
+
+    def test_ensure_for_creates_missing_profiles_only(self):
+        users = User.objects.bulk_create([User(username=f"user{i}") for i in range(3)])
+        Profile.objects.create(user=users[0], bio="kept")
+        Profile.objects.ensure_for(users)
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 3)
+        self.assertEqual(Profile.objects.get(user=users[0]).bio, "kept")
+
+
+def png(size=(400, 300)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, "red").save(buf, "PNG")
+    return buf.getvalue()
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = self.settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user("alice")
+        self.profile = Profile.objects.for_user(self.user)
+        self.profile.image.save("avatar.png", ContentFile(png()))
+
+    def test_build_variants(self):
+        digest = build_variants(self.profile.pk)
+        for size, px in SIZES.items():
+            for ext in FORMATS:
+                with default_storage.open(thumb_name(digest, size, ext)) as f:
+                    self.assertEqual(Image.open(f).size, (px, px))
+        self.assertEqual(Profile.objects.get(pk=self.profile.pk).image_hash, digest)
+
+    def test_variants_are_cacheable_forever(self):
+        digest = build_variants(self.profile.pk)
+        name = thumb_name(digest, "md", "webp").removeprefix(f"{THUMB_DIR}/")
+        resp = self.client.get(reverse("accounts:thumbnail", args=[name]))
+        self.assertEqual(resp["Content-Type"], "image/webp")
+        self.assertEqual(resp["Cache-Control"], "public, max-age=31536000, immutable")
+        resp.close()
+        self.assertEqual(self.client.get(reverse("accounts:thumbnail", args=["../avatar.png"])).status_code, 404)
 
-# Create your tests here.
+    def test_upload_is_one_profile_update(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile("new.png", png((64, 64)), content_type="image/png")
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(reverse("accounts:profile_edit"), {"first_name": "Al", "image": upload})
+        self.assertRedirects(resp, reverse("accounts:profile"), fetch_redirect_response=False)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "accounts_profile"')]
+        self.assertEqual(len(updates), 1)
@@ -0,0 +1,120 @@
+"""
+Avatar thumbnails for Profile.image: square WebP/JPEG variants, built off
+the request thread and stored under the image's content hash.
+"""
+import hashlib
+import io
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+
+SIZES = {"sm": 48, "md": 160}
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+THUMB_DIR = "thumbs"
+NAME_RE = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{32}-\d+\.(webp|jpg)$")
+
+MAX_WORKERS = getattr(settings, "MAVBRACKET_THUMBNAIL_WORKERS", 2)
+MAX_PENDING = getattr(settings, "MAVBRACKET_THUMBNAIL_QUEUE", 64)
+
+
+def _relative(digest: str, size: str, ext: str) -> str:
+    return f"{digest[:2]}/{digest}-{SIZES[size]}.{ext}"
+
+
+def thumb_name(digest: str, size: str, ext: str) -> str:
+    """Storage name of one variant (matched by NAME_RE without the THUMB_DIR prefix)."""
+    return f"{THUMB_DIR}/{_relative(digest, size, ext)}"
+
+
+def build_variants(profile_id: int):
+    """Create any missing variants of the profile's current image; returns its hash."""
+    profile = Profile.objects.filter(pk=profile_id).only("image").first()
+    if profile is None or not profile.image or not profile.image.storage.exists(profile.image.name):
+        return None
+    source = profile.image.name
+    with profile.image.open("rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()[:32]
+
+    if not all(default_storage.exists(thumb_name(digest, s, e)) for s in SIZES for e in FORMATS):
+        img = Image.open(io.BytesIO(data))
+        img.draft("RGB", (max(SIZES.values()) * 2,) * 2)   # JPEG: decode at reduced scale
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            flat = Image.new("RGB", img.size, "white")
+            flat.paste(img, mask=img.getchannel("A"))
+            img = flat
+        else:
+            img = img.convert("RGB")
+        for size, px in SIZES.items():
+            fitted = ImageOps.fit(img, (px, px), Image.Resampling.LANCZOS)
+            for ext, (fmt, params) in FORMATS.items():
+                name = thumb_name(digest, size, ext)
+                if default_storage.exists(name):
+                    continue
+                buf = io.BytesIO()
+                fitted.save(buf, fmt, **params)
+                default_storage.save(name, ContentFile(buf.getvalue()))
+
+    # only if the image wasn't replaced meanwhile
+    Profile.objects.filter(pk=profile_id, image=source).update(image_hash=digest)
+    return digest
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(MAX_PENDING)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="thumbnails")
+    return _executor
+
+
+def _run(profile_id: int) -> None:
+    try:
+        build_variants(profile_id)
+    except Exception:
+        logger.exception("thumbnailing profile %s failed", profile_id)
+    finally:
+        connection.close()   # this worker thread's connection
+        _pending.release()
+
+
+def schedule(profile_id: int) -> None:
+    """Build thumbnails in the background once the current transaction commits."""
+    def submit():
+        if not _pending.acquire(blocking=False):
+            # back-pressure: `manage.py build_thumbnails` picks these up later
+            logger.warning("thumbnail queue full; skipped profile %s", profile_id)
+            return
+        _get_executor().submit(_run, profile_id)
+    transaction.on_commit(submit)
+
+
+def avatar_urls(profile, size: str = "sm"):
+    """``{"webp": url, "jpg": url, "px": n}`` for a thumbnailed profile, else None."""
+    if profile is None or not profile.image_hash:
+        return None
+    urls = {ext: reverse("accounts:thumbnail", args=[_relative(profile.image_hash, size, ext)]) for ext in FORMATS}
+    return {"px": SIZES[size], **urls}
@@ -9,4 +9,5 @@ urlpatterns = [
     path('profile/edit/', views.profile_edit, name='profile_edit'),
     path('register/', views.register, name='register'),
     path('u/<int:user_id>/', views.user_public, name='user_public'),  # public profile
+    path('thumbs/<path:name>', views.thumbnail, name='thumbnail'),  # content-hashed avatar variants
 ]
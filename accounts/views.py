@@ -1,10 +1,16 @@
 # accounts/views.py
 from django.contrib.auth import get_user_model, login
 from django.contrib.auth.decorators import login_required
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django import forms
 
+from . import thumbnails
+from .forms import AvatarForm
+from .models import Profile
+
 User = get_user_model()
 
 def home(request):
@@ -35,19 +41,43 @@ def register(request):
 
 @login_required
 def profile(request):
-    return render(request, "accounts/profile.html")
+    # first visit provisions the profile row
+    return render(request, "accounts/profile.html", {"profile": Profile.objects.for_user(request.user)})
 
 @login_required
 def profile_edit(request):
-    if request.method == "POST":
+    # a Profile of its own, not the one cached on request.user: saving the user
+    # would otherwise write the new image as well (see signals.save_profile)
+    profile, _ = Profile.objects.get_or_create(user_id=request.user.pk)
+    avatar_form = AvatarForm(request.POST or None, request.FILES or None, instance=profile)
+    if request.method == "POST" and avatar_form.is_valid():
         request.user.first_name = request.POST.get("first_name", "").strip()
         request.user.last_name = request.POST.get("last_name", "").strip()
         request.user.email = request.POST.get("email", "").strip()
         request.user.save()
+        if "image" in request.FILES:
+            profile = avatar_form.save(commit=False)
+            profile.image_hash = ""          # old thumbnails no longer apply
+            profile.save(update_fields=["image", "image_hash"])
+            thumbnails.schedule(profile.pk)  # resized off the request thread
         messages.success(request, "Profile updated.")
         return redirect("accounts:profile")
-    return render(request, "accounts/profile_edit.html")
+    return render(request, "accounts/profile_edit.html", {"avatar_form": avatar_form})
 
 def user_public(request, user_id):
-    u = get_object_or_404(User, pk=user_id)
+    u = get_object_or_404(User.objects.select_related("profile"), pk=user_id)
     return render(request, "accounts/user_public.html", {"u": u})
+
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def thumbnail(request, name):
+    """Serve an avatar variant; names are content-hashed, so they are cacheable forever."""
+    if not thumbnails.NAME_RE.match(name):
+        raise Http404
+    try:
+        f = default_storage.open(f"{thumbnails.THUMB_DIR}/{name}", "rb")
+    except FileNotFoundError:
+        raise Http404
+    resp = FileResponse(f, content_type="image/webp" if name.endswith(".webp") else "image/jpeg")
+    resp["Cache-Control"] = THUMBNAIL_CACHE_CONTROL
+    return resp
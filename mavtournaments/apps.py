@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class MavtournamentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mavtournaments'
+
+    def ready(self):
+        from .services.sqlite_tuning import set_pragmas
+        from .services import team_membership, tournament_cache
+        from .services.team_search import ensure_team_fts
+        connection_created.connect(set_pragmas)
+        tournament_cache.connect_signals()
+        team_membership.connect_signals()
+        post_migrate.connect(ensure_team_fts, sender=self)
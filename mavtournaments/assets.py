@@ -0,0 +1,106 @@
+# mavtournaments/assets.py
+"""
+Static asset pipeline: content-hashed, pre-gzipped ``collectstatic`` output
+and ``serve_static`` for deployments without a front-end server.
+"""
+import gzip
+import mimetypes
+import os
+import posixpath
+import shutil
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+
+GZIP_EXTENSIONS = {".css", ".js", ".json", ".map", ".svg", ".txt", ".html", ".xml"}
+GZIP_MIN_SIZE = 256     # bytes; smaller files barely shrink
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# unhashed names can change under the same URL
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes a ``.gz`` sibling for text assets."""
+
+    # A name missing from the manifest (no collectstatic since it was added,
+    # or none at all, e.g. under the test runner) falls back to its plain,
+    # unhashed URL instead of failing the whole page with a 500.
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:   # not in STATIC_ROOT either, so nothing to hash
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if posixpath.splitext(name)[1] in GZIP_EXTENSIONS:
+                self._compress(name)
+
+    def _compress(self, name: str) -> bool:
+        path = self.path(name)
+        if os.path.getsize(path) < GZIP_MIN_SIZE:
+            return False
+        tmp = path + ".gz.tmp"
+        # mtime=0 keeps the output byte-identical across collectstatic runs
+        with open(path, "rb") as src, open(tmp, "wb") as raw, \
+                gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=9, mtime=0) as out:
+            shutil.copyfileobj(src, out)
+        if os.path.getsize(tmp) >= os.path.getsize(path):
+            os.remove(tmp)
+            return False
+        os.replace(tmp, path + ".gz")
+        return True
+
+
+_immutable_names = None
+
+
+def _is_hashed(name: str) -> bool:
+    global _immutable_names
+    if _immutable_names is None:
+        hashed = getattr(staticfiles_storage, "hashed_files", None) or {}
+        _immutable_names = frozenset(hashed.values())
+    return name in _immutable_names
+
+
+def accepts_gzip(request) -> bool:
+    return "gzip" in request.headers.get("Accept-Encoding", "")
+
+
+@require_safe
+def serve_static(request, path):
+    """
+    Serve a collected file from ``STATIC_ROOT``: the pre-compressed copy when
+    the client accepts gzip, with far-future immutable caching for hashed
+    names.
+    """
+    name = posixpath.normpath(path).lstrip("/")
+    try:
+        full = safe_join(staticfiles_storage.location, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full):
+        raise Http404
+
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    encoding = None
+    if accepts_gzip(request) and os.path.isfile(full + ".gz"):
+        full, encoding = full + ".gz", "gzip"
+
+    resp = FileResponse(open(full, "rb"), content_type=content_type)
+    if encoding:
+        resp["Content-Encoding"] = encoding
+    if posixpath.splitext(name)[1] in GZIP_EXTENSIONS:
+        patch_vary_headers(resp, ["Accept-Encoding"])
+    resp["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if _is_hashed(name) else REVALIDATE_CACHE_CONTROL
+    return resp
@@ -54,7 +54,7 @@ class BulkTeamsForm(forms.Form):
     default_max_players = forms.IntegerField(label="Max players per team", min_value=1, max_value=64)
     create_missing_users = forms.BooleanField(
         required=False, initial=False,
-        help_text="If checked, unknown usernames will be auto-created with a random password."
+        help_text="If checked, unknown usernames will be auto-created with an unusable password (they set one via password reset)."
     )
 
     def clean(self):
@@ -0,0 +1,80 @@
+# mavtournaments/management/commands/_bench.py
+"""
+Shared helpers for the ``bench_*`` management commands.
+
+The leading underscore keeps Django from listing this module as a command.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.utils.text import slugify
+
+from mavtournaments.models import Tournament, Team
+
+
+@contextmanager
+def throwaway_database(on_disk: bool = False):
+    """
+    Run the body against a freshly migrated test database (in-memory for
+    SQLite, ``TEST.NAME`` otherwise) and drop it afterwards, so benchmarks
+    never touch the real data.
+
+    ``on_disk`` puts the SQLite database in a temporary file instead, for
+    benchmarks that hit it from several threads: a shared-cache in-memory
+    database reports lock conflicts immediately instead of waiting.
+    """
+    old_name = connection.settings_dict["NAME"]
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    old_test_name = test_settings.get("NAME")
+    if on_disk and connection.vendor == "sqlite":
+        test_settings["NAME"] = os.path.join(tempfile.mkdtemp(prefix="mavbracket-bench-"), "bench.sqlite3")
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings["NAME"] = old_test_name
+
+
+class QueryCounter:
+    """Cheap execute_wrapper that counts statements without recording SQL."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def measure():
+    """Yield a dict that receives ``queries`` and ``seconds`` once the block exits."""
+    result = {}
+    counter = QueryCounter()
+    start = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        yield result
+    result["seconds"] = time.perf_counter() - start
+    result["queries"] = counter.count
+
+
+def make_tournament(n_teams: int, name: str = "") -> Tournament:
+    """Create a tournament with ``n_teams`` synthetic teams in two queries."""
+    t = Tournament.objects.create(name=name or f"Bench {n_teams}", team_cap=max(n_teams, 2))
+    teams = []
+    for i in range(n_teams):
+        team_name = f"Team {i + 1:05d}"
+        teams.append(Team(tournament=t, name=team_name, search_slug=slugify(team_name)))
+    Team.objects.bulk_create(teams)
+    return t
+
+
+def power_of_two_sizes(low: int, high: int):
+    size = low
+    while size <= high:
+        yield size
+        size *= 2
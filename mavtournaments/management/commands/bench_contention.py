@@ -0,0 +1,101 @@
+# mavtournaments/management/commands/bench_contention.py
+import queue
+import random
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.db.models import F, Sum
+
+from mavtournaments.models import Match, Team
+from mavtournaments.services.bracket_builder import MatchConflict, generate_single_elim, set_winner
+
+from ._bench import make_tournament, throwaway_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent set_winner submissions at one bracket (throwaway on-disk DB) and "
+        "report throughput and conflict rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teams", type=int, default=64)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--per-match", type=int, default=4,
+                            help="Submissions per match; roughly half of them pick the other team.")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs.")
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        with throwaway_database(on_disk=True):
+            t = make_tournament(opts["teams"])
+            generate_single_elim(t)
+            outcomes = Counter()
+            elapsed = 0.0
+
+            # one wave per round: every playable match gets --per-match racing submissions
+            while True:
+                ready = list(
+                    Match.objects.filter(tournament=t, winner__isnull=True,
+                                         team1__isnull=False, team2__isnull=False)
+                    .values_list("pk", "team1_id", "team2_id")
+                )
+                if not ready:
+                    break
+                jobs = [(pk, rng.choice((t1, t2))) for pk, t1, t2 in ready for _ in range(opts["per_match"])]
+                rng.shuffle(jobs)
+                elapsed += self._run_wave(jobs, opts["threads"], outcomes)
+
+            submitted = sum(outcomes.values())
+            wins = Team.objects.filter(tournament=t).aggregate(n=Sum("wins"))["n"] or 0
+            decided = Match.objects.filter(tournament=t, is_bye=False, winner__isnull=False).count()
+            twice = Match.objects.filter(tournament=t, team1__isnull=False, team1=F("team2")).count()
+
+        self.stdout.write(f"submissions  {submitted} from {opts['threads']} threads in {elapsed:.2f}s "
+                          f"({submitted / elapsed if elapsed else 0:.0f}/s)")
+        for key in ("recorded", "duplicate", "conflict", "error"):
+            share = 100 * outcomes[key] / submitted if submitted else 0
+            self.stdout.write(f"{key:<12} {outcomes[key]:>6} ({share:.1f}%)")
+        ok = wins == decided and twice == 0 and outcomes["recorded"] == decided
+        self.stdout.write(f"consistency  wins={wins} decided={decided} same-team-twice={twice} -> "
+                          + ("OK" if ok else "BROKEN"))
+
+    def _run_wave(self, jobs, n_threads, outcomes) -> float:
+        work = queue.Queue()
+        for job in jobs:
+            work.put(job)
+        lock = threading.Lock()
+
+        def worker():
+            local = Counter()
+            try:
+                while True:
+                    try:
+                        match_id, team_id = work.get_nowait()
+                    except queue.Empty:
+                        break
+                    match = (Match.objects.select_related("tournament", "round", "team1", "team2", "next_win")
+                             .get(pk=match_id))
+                    winner = match.team1 if match.team1_id == team_id else match.team2
+                    try:
+                        local["recorded" if set_winner(match, winner) else "duplicate"] += 1
+                    except MatchConflict:
+                        local["conflict"] += 1
+                    except OperationalError:
+                        # e.g. "database is locked" once the busy timeout runs out
+                        local["error"] += 1
+            finally:
+                connection.close()
+                with lock:
+                    outcomes.update(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+        start = time.perf_counter()
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        return time.perf_counter() - start
@@ -0,0 +1,32 @@
+# mavtournaments/management/commands/bench_generate.py
+from django.core.management.base import BaseCommand
+
+from mavtournaments.services.bracket_builder import generate_single_elim
+
+from ._bench import make_tournament, measure, power_of_two_sizes, throwaway_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark generate_single_elim: query count and wall time for 8..8192 teams, "
+        "first build and regeneration over an existing bracket (throwaway DB)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-teams", type=int, default=8)
+        parser.add_argument("--max-teams", type=int, default=8192)
+        parser.add_argument("--seed", choices=["POWER", "RANDOM"], default="POWER")
+
+    def handle(self, *args, **opts):
+        with throwaway_database():
+            self.stdout.write(f"{'teams':>6} {'queries':>8} {'ms':>10} {'regen q':>8} {'regen ms':>10}")
+            for n in power_of_two_sizes(opts["min_teams"], opts["max_teams"]):
+                t = make_tournament(n)
+                with measure() as first:
+                    generate_single_elim(t, seed_method=opts["seed"])
+                with measure() as again:   # re-seeding wipes the previous tree first
+                    generate_single_elim(t, seed_method=opts["seed"])
+                self.stdout.write(
+                    f"{n:>6} {first['queries']:>8} {first['seconds'] * 1000:>10.1f}"
+                    f" {again['queries']:>8} {again['seconds'] * 1000:>10.1f}"
+                )
@@ -0,0 +1,175 @@
+# mavtournaments/management/commands/bench_mavbracket.py
+import json
+import platform
+import sqlite3
+import time
+import tracemalloc
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from mavtournaments import views
+from mavtournaments.models import Match, Tournament
+from mavtournaments.services.bracket_builder import generate_single_elim, set_winner
+from mavtournaments.services.bracket_layout import CANVAS_MIN_TEAMS
+
+from ._bench import make_tournament, measure, power_of_two_sizes, throwaway_database
+
+STAGES = ("generate", "sweep", "bracket_data", "bracket_columnar", "bracket_page")
+
+
+def sweep_to_champion(t: Tournament) -> int:
+    """Decide every match (team1 always wins), round by round; returns results recorded."""
+    recorded = 0
+    for ri in range(t.round_count):
+        playable = (
+            Match.objects.filter(tournament=t, round__index=ri, winner__isnull=True,
+                                 team1__isnull=False, team2__isnull=False)
+            .select_related("tournament", "round", "team1", "team2", "next_win")
+        )
+        for m in playable:
+            recorded += set_winner(m, m.team1)
+    return recorded
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the bracket engine on synthetic tournaments in a throwaway DB: generation, a full "
+        "set_winner sweep, bracket_data (JSON and columnar) and the bracket page. Prints JSON; "
+        "--baseline compares."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-teams", type=int, default=8)
+        parser.add_argument("--max-teams", type=int, default=8192)
+        parser.add_argument("--stages", default=",".join(STAGES),
+                            help=f"Comma-separated subset of: {', '.join(STAGES)}.")
+        parser.add_argument("--repeat", type=int, default=1, help="Best-of-N wall time per stage.")
+        parser.add_argument("--no-memory", action="store_true",
+                            help="Skip the extra tracemalloc pass that measures peak memory.")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+        parser.add_argument("--baseline", help="JSON report of an earlier run to compare against.")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed relative slowdown before a stage counts as a regression.")
+        parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                            help="Ignore slowdowns smaller than this (timer noise on tiny stages).")
+
+    def handle(self, *args, **opts):
+        stages = [s for s in opts["stages"].split(",") if s]
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise CommandError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+        results = []
+        with throwaway_database():
+            user = get_user_model().objects.create_superuser("bench", "bench@example.com", None)
+            for n in power_of_two_sizes(opts["min_teams"], opts["max_teams"]):
+                t = make_tournament(n)
+                for stage in stages:
+                    row = {"teams": n, "stage": stage, **self._run_stage(stage, t, user, opts)}
+                    results.append(row)
+                    self.stderr.write(
+                        f"{n:>6} {stage:<16} {row['seconds'] * 1000:>10.1f} ms {row['queries']:>7} q"
+                        + (f" {row['peak_kib']:>9} KiB" if "peak_kib" in row else "")
+                    )
+
+        report = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+            },
+            "results": results,
+        }
+        if opts["baseline"]:
+            report["regressions"] = self._compare(results, opts)
+
+        text = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as f:
+                f.write(text + "\n")
+        else:
+            self.stdout.write(text)
+
+        if report.get("regressions"):
+            for r in report["regressions"]:
+                self.stderr.write(self.style.ERROR(
+                    f"regression: {r['teams']} teams {r['stage']} {r['metric']} {r['baseline']} -> {r['current']}"
+                ))
+            raise CommandError(f"{len(report['regressions'])} regression(s) against {opts['baseline']}")
+
+    def _run_stage(self, stage: str, t: Tournament, user, opts) -> dict:
+        factory = RequestFactory()
+        headers = {"Accept": views.BRACKET_COLUMNAR_TYPE} if stage == "bracket_columnar" else {}
+
+        def get(view, **extra):
+            request = factory.get("/", headers={**headers, **extra})
+            request.user = user
+            return view(request, pk=t.pk)
+
+        def setup():
+            cache.clear()  # measure the work, not the per-tournament cache
+            if stage in ("generate", "sweep"):
+                generate_single_elim(t)
+            t.refresh_from_db()
+
+        def run():
+            if stage == "generate":
+                generate_single_elim(t)
+            elif stage == "sweep":
+                sweep_to_champion(t)
+            else:
+                resp = get(views.bracket if stage == "bracket_page" else views.bracket_data)
+                resp.render() if hasattr(resp, "render") else resp.content
+
+        best = None
+        for _ in range(max(opts["repeat"], 1)):
+            setup()
+            with measure() as m:
+                run()
+            if best is None or m["seconds"] < best["seconds"]:
+                best = m
+        row = {"seconds": round(best["seconds"], 6), "queries": best["queries"]}
+        if stage == "bracket_page":
+            # same rule as views.bracket; SVG and canvas timings are not comparable
+            row["renderer"] = "canvas" if t.bracket_size >= CANVAS_MIN_TEAMS else "svg"
+        if stage in ("bracket_data", "bracket_columnar"):
+            # payload sizes, plain and as sent to clients that accept gzip
+            row["bytes"] = len(get(views.bracket_data).content)
+            row["gzip_bytes"] = len(get(views.bracket_data, **{"Accept-Encoding": "gzip"}).content)
+
+        if not opts["no_memory"]:
+            setup()
+            tracemalloc.start()
+            try:
+                run()
+                row["peak_kib"] = tracemalloc.get_traced_memory()[1] // 1024
+            finally:
+                tracemalloc.stop()
+        return row
+
+    def _compare(self, results, opts) -> list:
+        try:
+            with open(opts["baseline"]) as f:
+                baseline = {(r["teams"], r["stage"]): r for r in json.load(f)["results"]}
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read baseline {opts['baseline']}: {exc}")
+
+        regressions = []
+        for row in results:
+            old = baseline.get((row["teams"], row["stage"]))
+            if old is None or old.get("renderer") != row.get("renderer"):
+                continue
+            slower = row["seconds"] - old["seconds"]
+            if slower * 1000 > opts["min_delta_ms"] and row["seconds"] > old["seconds"] * (1 + opts["tolerance"]):
+                regressions.append({"teams": row["teams"], "stage": row["stage"], "metric": "seconds",
+                                    "baseline": old["seconds"], "current": row["seconds"]})
+            if row["queries"] > old["queries"]:
+                regressions.append({"teams": row["teams"], "stage": row["stage"], "metric": "queries",
+                                    "baseline": old["queries"], "current": row["queries"]})
+        return regressions
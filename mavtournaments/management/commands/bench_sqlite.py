@@ -0,0 +1,130 @@
+# mavtournaments/management/commands/bench_sqlite.py
+import multiprocessing
+import random
+import statistics
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from mavtournaments.models import Match, Standing, Tournament
+from mavtournaments.services.bracket_builder import MatchConflict, generate_single_elim, set_winner
+from mavtournaments.services.sqlite_tuning import PROFILES, apply_profile
+
+from ._bench import make_tournament, throwaway_database
+
+
+@contextmanager
+def database_profile(name: str):
+    """Swap the default connection to profile ``name`` (new connections only)."""
+    db = connection.settings_dict
+    saved = dict(db, OPTIONS=dict(db.get("OPTIONS", {})))
+    for key in ("PRAGMAS", "CONN_MAX_AGE", "CONN_HEALTH_CHECKS"):
+        db.pop(key, None)
+    db["OPTIONS"] = {k: v for k, v in db.get("OPTIONS", {}).items() if k not in ("timeout", "transaction_mode")}
+    db.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False)
+    apply_profile(db, name)
+    connection.close()
+    try:
+        yield
+    finally:
+        connection.close()
+        db.clear()
+        db.update(saved)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mixed read/write load on a throwaway on-disk SQLite DB, once per database profile: "
+        "spectator reads (the standings page query) race result submissions and regenerations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default=",".join(PROFILES))
+        parser.add_argument("--teams", type=int, default=256)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--regen-every", type=int, default=50,
+                            help="Each writer regenerates the whole bracket after this many results.")
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"{'profile':<12} {'reads/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+                          f"{'writes/s':>9} {'regens':>7} {'locked':>7}")
+        for name in opts["profiles"].split(","):
+            with database_profile(name), throwaway_database(on_disk=True):
+                t = make_tournament(opts["teams"])
+                generate_single_elim(t)
+                stats = self._run(t.pk, opts)
+            lat = sorted(stats["latency"]) or [0.0]
+            secs = opts["seconds"]
+            self.stdout.write(
+                f"{name:<12} {len(stats['latency']) / secs:>8.0f} {statistics.median(lat) * 1000:>8.1f} "
+                f"{lat[int(len(lat) * 0.95) - 1 if len(lat) > 1 else 0] * 1000:>8.1f} {lat[-1] * 1000:>8.1f} "
+                f"{stats['counts']['write'] / secs:>9.0f} {stats['counts']['regen']:>7} "
+                f"{stats['counts']['locked']:>7}"
+            )
+
+    def _run(self, tournament_id: int, opts) -> dict:
+        # worker processes, not threads: like a real multi-worker deployment,
+        # and the GIL would otherwise hide most of the database contention
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+        deadline = time.time() + opts["seconds"]
+        connection.close()  # children must not share the parent's connection
+        procs = [ctx.Process(target=_reader, args=(tournament_id, deadline, results))
+                 for _ in range(opts["readers"])]
+        procs += [ctx.Process(target=_writer, args=(tournament_id, deadline, i, opts["regen_every"], results))
+                  for i in range(opts["writers"])]
+        for p in procs:
+            p.start()
+        latency, counts = [], Counter()
+        for _ in procs:
+            local_latency, local_counts = results.get()
+            latency.extend(local_latency)
+            counts.update(local_counts)
+        for p in procs:
+            p.join()
+        return {"latency": latency, "counts": counts}
+
+
+def _reader(tournament_id, deadline, results):
+    latency, counts = [], Counter()
+    while time.time() < deadline:
+        start = time.perf_counter()
+        try:
+            list(Standing.objects.filter(tournament_id=tournament_id).select_related("team")[:50])
+        except OperationalError:
+            counts["locked"] += 1
+            continue
+        latency.append(time.perf_counter() - start)
+    connection.close()
+    results.put((latency, counts))
+
+
+def _writer(tournament_id, deadline, seed, regen_every, results):
+    rng = random.Random(seed)
+    counts = Counter()
+    while time.time() < deadline:
+        try:
+            playable = list(
+                Match.objects.filter(tournament_id=tournament_id, winner__isnull=True,
+                                     team1__isnull=False, team2__isnull=False)
+                .select_related("tournament", "round", "team1", "team2", "next_win")[:8]
+            )
+            if not playable or counts["write"] >= (counts["regen"] + 1) * regen_every:
+                # the heaviest write we have: wipe and rebuild the whole bracket
+                generate_single_elim(Tournament.objects.get(pk=tournament_id))
+                counts["regen"] += 1
+                continue
+            m = rng.choice(playable)
+            set_winner(m, rng.choice((m.team1, m.team2)))
+            counts["write"] += 1
+        except MatchConflict:
+            counts["conflict"] += 1
+        except OperationalError:
+            counts["locked"] += 1
+    connection.close()
+    results.put(([], counts))
@@ -3,7 +3,8 @@ from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
 from django.db import transaction
-from mavtournaments.models import Tournament, Team, TeamMembership
+from mavtournaments.models import Tournament, Team
+from mavtournaments.services.team_membership import MembershipError, join_team
 
 User = get_user_model()
 
@@ -81,7 +82,10 @@ class Command(BaseCommand):
             for pair, team in zip(pairs, teams[:2]):
                 for uname in pair:
                     u = User.objects.get(username=uname)
-                    TeamMembership.objects.get_or_create(team=team, user=u)
+                    try:
+                        join_team(team, u)
+                    except MembershipError:
+                        pass  # already attached on a previous run
             self.stdout.write(self.style.SUCCESS("Attached user1..user4 to first two Demo teams."))
         except Tournament.DoesNotExist:
             self.stdout.write("Demo Bracket not found (skip team attachments).")
@@ -0,0 +1,22 @@
+# mavtournaments/management/commands/publish_snapshots.py
+from django.core.management.base import BaseCommand
+
+from mavtournaments.models import Tournament
+from mavtournaments.services import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the static spectator snapshots (page + columnar JSON) now, e.g. after a restart "
+        "dropped pending debounced rewrites. Works whether or not MAVBRACKET_SNAPSHOTS is set."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("tournament_ids", nargs="*", type=int,
+                            help="Tournaments to publish (default: all).")
+
+    def handle(self, *args, **opts):
+        ids = opts["tournament_ids"] or Tournament.objects.order_by("pk").values_list("pk", flat=True)
+        for pk in ids:
+            directory = snapshots.publish(pk)
+            self.stdout.write(f"tournament {pk}: {directory or 'not found, snapshot removed'}")
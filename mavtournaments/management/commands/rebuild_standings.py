@@ -0,0 +1,23 @@
+# mavtournaments/management/commands/rebuild_standings.py
+from django.core.management.base import BaseCommand
+
+from mavtournaments.models import Tournament
+from mavtournaments.services.standings import rebuild_standings
+from mavtournaments.services.tournament_cache import bump
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized standings (and team win/loss counters) from match results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tournament_ids", nargs="*", type=int,
+                            help="Tournaments to rebuild (default: all).")
+
+    def handle(self, *args, **opts):
+        qs = Tournament.objects.order_by("pk")
+        if opts["tournament_ids"]:
+            qs = qs.filter(pk__in=opts["tournament_ids"])
+        for t in qs:
+            n = rebuild_standings(t)
+            bump(t.pk)
+            self.stdout.write(f"{t.name}: {n} standings")
@@ -1,9 +1,14 @@
 #TourneyBracket/mavtournaments/management/commands/seed_mavbracket.py
+import random
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.db import transaction
-from mavtournaments.models import Tournament, Team, TeamMembership
+from django.utils.text import slugify
+from accounts.models import Profile
+from mavtournaments.models import Match, Tournament, Team, TeamMembership
+from mavtournaments.services.bracket_builder import generate_single_elim, set_winner
 
 User = get_user_model()
 
@@ -23,32 +28,104 @@ LAST  = ["Smith","Johnson","Brown","Davis","Miller","Wilson","Moore","Taylor","A
          "Lewis","Lee","Walker","Hall","Allen","Young","Hernandez","King","Wright","Lopez",
          "Hill","Scott","Green","Adams","Baker","Gonzalez","Nelson","Carter","Mitchell","Perez"]
 
+BATCH_SIZE = 2000
+
 def make_name(i): return f"{FIRST[i%len(FIRST)]} {LAST[(i*3)%len(LAST)]}"
 
+def team_name(i):
+    # the classic 32 names first, then numbered rounds of them
+    base = TEAM_NAMES[i % len(TEAM_NAMES)]
+    return base if i < len(TEAM_NAMES) else f"{base} {i // len(TEAM_NAMES) + 1}"
+
 class Command(BaseCommand):
-    help = "Seed demo tournament with 32 teams and players"
+    help = (
+        "Seed demo data in bulk: N users (one shared password hash, profiles included), tournaments "
+        "of teams, and optionally generated brackets with random results. Defaults match the old "
+        "demo: 64 users, one 'Demo Bracket' with 32 teams of 2."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=64)
+        parser.add_argument("--tournaments", type=int, default=1)
+        parser.add_argument("--teams", type=int, default=32, help="Teams per tournament.")
+        parser.add_argument("--team-size", type=int, default=2)
+        parser.add_argument("--password", default="password", help="Password of every seeded user.")
+        parser.add_argument("--brackets", action="store_true", help="Generate each tournament's bracket.")
+        parser.add_argument("--results", type=float, default=0.0,
+                            help="With --brackets: fraction (0-1) of matches to decide at random.")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible data.")
 
-    @transaction.atomic
     def handle(self, *args, **opts):
-        # users
-        users = []
-        for i in range(64):  # make 64 users
-            username = f"player{i+1}"
-            u, _ = User.objects.get_or_create(
-                username=username,
-                defaults={"first_name": FIRST[i%len(FIRST)], "last_name": LAST[(i*3)%len(LAST)]}
+        n_users, n_teams, size = opts["users"], opts["teams"], opts["team_size"]
+        if min(n_users, opts["tournaments"], n_teams, size) < 1:
+            raise CommandError("--users, --tournaments, --teams and --team-size must be positive.")
+        if n_teams * size > n_users:
+            raise CommandError(f"{n_teams} teams of {size} need at least {n_teams * size} users.")
+        if n_teams > Tournament.MAX_TEAM_CAP:
+            raise CommandError(f"At most {Tournament.MAX_TEAM_CAP} teams per tournament.")
+        if not 0 <= opts["results"] <= 1:
+            raise CommandError("--results is a fraction between 0 and 1.")
+        rng = random.Random(opts["seed"])
+
+        with transaction.atomic():
+            user_ids = self._seed_users(n_users, opts["password"])
+            tournaments = self._seed_tournaments(opts["tournaments"], n_teams, size, user_ids)
+        self.stdout.write(f"{n_users} users, {len(tournaments)} tournaments x {n_teams} teams of {size}")
+
+        if opts["brackets"]:
+            decided = 0
+            for t in tournaments:
+                generate_single_elim(t)
+                decided += self._play(t, opts["results"], rng)
+            self.stdout.write(f"generated {len(tournaments)} brackets, decided {decided} matches")
+        self.stdout.write(self.style.SUCCESS("Seeded MavBracket demo data"))
+
+    def _seed_users(self, n: int, password: str) -> list:
+        usernames = [f"player{i+1}" for i in range(n)]
+        # one prefix scan instead of a giant IN (...) list
+        existing = dict(User.objects.filter(username__startswith="player").values_list("username", "pk"))
+        hashed = make_password(password)   # hashing once, not per user, is the whole speed-up
+        new = User.objects.bulk_create([
+            User(username=name, password=hashed, email=f"{name}@example.com",
+                 first_name=FIRST[i%len(FIRST)], last_name=LAST[(i*3)%len(LAST)])
+            for i, name in enumerate(usernames) if name not in existing
+        ], batch_size=BATCH_SIZE)
+        # provision profiles up front rather than one lazy INSERT per first visit
+        Profile.objects.ensure_for(new, batch_size=BATCH_SIZE)
+        existing.update((u.username, u.pk) for u in new)
+        return [existing[name] for name in usernames]
+
+    def _seed_tournaments(self, n: int, n_teams: int, size: int, user_ids: list) -> list:
+        names = ["Demo Bracket"] if n == 1 else [f"Demo Bracket {i+1}" for i in range(n)]
+        Tournament.objects.filter(name__in=names).delete()
+        tournaments = Tournament.objects.bulk_create([
+            Tournament(name=name, team_cap=max(n_teams, 2), default_team_size=size) for name in names
+        ])
+        for t in tournaments:
+            teams = Team.objects.bulk_create([
+                Team(tournament_id=t.pk, name=team_name(i), search_slug=slugify(team_name(i)),
+                     max_players=size, member_count=size)
+                for i in range(n_teams)
+            ], batch_size=BATCH_SIZE)
+            TeamMembership.objects.bulk_create([
+                TeamMembership(team_id=team.pk, user_id=user_ids[i * size + j])
+                for i, team in enumerate(teams) for j in range(size)
+            ], batch_size=BATCH_SIZE)
+        return tournaments
+
+    def _play(self, t: Tournament, fraction: float, rng: random.Random) -> int:
+        """Decide ``fraction`` of the real matches, round by round, with random winners."""
+        target = int(fraction * Match.objects.filter(tournament=t, is_bye=False).count())
+        decided = 0
+        for ri in range(t.round_count):
+            playable = (
+                Match.objects.filter(tournament=t, round__index=ri, winner__isnull=True,
+                                     team1__isnull=False, team2__isnull=False)
+                .select_related("tournament", "round", "team1", "team2", "next_win")
             )
-            if not u.email:
-                u.email = f"{username}@example.com"; u.set_password("password"); u.save()
-            users.append(u)
-
-        # tournament
-        t, _ = Tournament.objects.get_or_create(name="Demo Bracket", defaults={"team_cap": 32})
-        # teams
-        Team.objects.filter(tournament=t).delete()
-        for i, team_name in enumerate(TEAM_NAMES):
-            team = Team.objects.create(tournament=t, name=team_name)
-            a, b = users[2*i], users[2*i+1]
-            TeamMembership.objects.get_or_create(team=team, user=a)
-            TeamMembership.objects.get_or_create(team=team, user=b)
-        self.stdout.write(self.style.SUCCESS("Seeded Demo Bracket with 32 teams"))
+            for m in playable:
+                if decided >= target:
+                    return decided
+                set_winner(m, rng.choice((m.team1, m.team2)))
+                decided += 1
+        return decided
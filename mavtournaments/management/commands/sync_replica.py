@@ -0,0 +1,35 @@
+# mavtournaments/management/commands/sync_replica.py
+import sqlite3
+import time
+from contextlib import closing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from mavtournaments.routers import PRIMARY, REPLICA, replica_configured
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database onto the replica file (MAVBRACKET_REPLICA_DB) with "
+        "SQLite's online backup API; --interval repeats it, standing in for replication locally."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=0,
+                            help="Seconds between copies; 0 copies once.")
+
+    def handle(self, *args, **opts):
+        if not replica_configured():
+            raise CommandError("No 'replica' database configured; set MAVBRACKET_REPLICA_DB.")
+        src, dst = (connections[alias].settings_dict for alias in (PRIMARY, REPLICA))
+        if "sqlite3" not in src["ENGINE"] or "sqlite3" not in dst["ENGINE"]:
+            raise CommandError("sync_replica only copies SQLite files; use real replication elsewhere.")
+        while True:
+            start = time.perf_counter()
+            with closing(sqlite3.connect(src["NAME"])) as s, closing(sqlite3.connect(dst["NAME"])) as d:
+                s.backup(d)
+            self.stdout.write(f"replica synced in {(time.perf_counter() - start) * 1000:.0f} ms")
+            if not opts["interval"]:
+                break
+            time.sleep(opts["interval"])
@@ -0,0 +1,119 @@
+# mavtournaments/middleware.py
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+
+from .routers import STICKY_COOKIE, STICKY_SECONDS, begin_request, end_request
+from .services import request_metrics
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Sets up per-request routing state for ``routers.ReplicaRouter`` and
+    gives read-your-writes: a response to a request that wrote to the
+    database carries a short-lived cookie, and requests carrying it never
+    read from the replica.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = begin_request(sticky=STICKY_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = end_request(token)
+        return self._mark(response, wrote)
+
+    async def __acall__(self, request):
+        token = begin_request(sticky=STICKY_COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrote = end_request(token)
+        return self._mark(response, wrote)
+
+    @staticmethod
+    def _mark(response, wrote: bool):
+        if wrote:
+            response.set_cookie(STICKY_COOKIE, "1", max_age=STICKY_SECONDS, httponly=True, samesite="Lax")
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Optional (``MAVBRACKET_SERVER_TIMING = True``): measures query count, DB
+    time, template render time and total time of each request, sends them
+    as a ``Server-Timing`` header (visible in the browser's network panel)
+    and feeds the per-URL-name aggregate behind ``tournaments:request_timings``.
+    ``app`` is the remainder: Python time in views and middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "MAVBRACKET_SERVER_TIMING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        if not getattr(Template.render, "_mavbracket_timed", False):
+            Template.render = request_metrics.timed_render(Template.render)
+
+    def _begin(self):
+        metrics = request_metrics.RequestMetrics()
+        token = request_metrics.current.set(metrics)
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(request_metrics.query_timer))
+        return metrics, token, stack, time.perf_counter()
+
+    def _finish(self, request, response, metrics, token, stack, start):
+        total = time.perf_counter() - start
+        stack.close()
+        request_metrics.current.reset(token)
+        app = max(total - metrics.db - metrics.template, 0.0)
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={metrics.db * 1000:.1f};desc="{metrics.queries} queries"',
+            f"tpl;dur={metrics.template * 1000:.1f}",
+            f"app;dur={app * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+        match = getattr(request, "resolver_match", None)
+        name = match.view_name if match else "<unresolved>"
+        request_metrics.record(name, metrics, total)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self._begin()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            state[2].close()
+            request_metrics.current.reset(state[1])
+            raise
+        return self._finish(request, response, *state)
+
+    async def __acall__(self, request):
+        state = self._begin()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            state[2].close()
+            request_metrics.current.reset(state[1])
+            raise
+        return self._finish(request, response, *state)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:04
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mavtournaments', '0004_alter_match_options_alter_tournament_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tournament',
+            name='team_cap',
+            field=models.PositiveIntegerField(default=32, validators=[django.core.validators.MinValueValidator(2), django.core.validators.MaxValueValidator(8192)]),
+        ),
+    ]
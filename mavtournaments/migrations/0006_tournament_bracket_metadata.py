@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_bracket_metadata(apps, schema_editor):
+    Tournament = apps.get_model("mavtournaments", "Tournament")
+    Match = apps.get_model("mavtournaments", "Match")
+    for t in Tournament.objects.all():
+        final = Match.objects.filter(tournament=t).order_by("-round__index", "slot").first()
+        if final is None:
+            continue
+        t.final_match = final
+        t.round_count = final.round.index + 1
+        t.bracket_size = 1 << t.round_count
+        t.save(update_fields=["final_match", "round_count", "bracket_size"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mavtournaments', '0005_tournament_team_cap_limits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='bracket_size',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='final_match',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='mavtournaments.match'),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='result_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='round_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_bracket_metadata, migrations.RunPython.noop),
+    ]
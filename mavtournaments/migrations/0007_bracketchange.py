@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mavtournaments', '0006_tournament_bracket_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BracketChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('kind', models.CharField(choices=[('GENERATED', 'Bracket generated'), ('WINNER', 'Winner set'), ('ADVANCE', 'Team advanced'), ('FINISHED', 'Tournament finished')], max_length=12)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('match', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='mavtournaments.match')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='mavtournaments.tournament')),
+            ],
+            options={
+                'ordering': ['version', 'id'],
+                'indexes': [models.Index(fields=['tournament', 'version'], name='mavtourname_tournam_8a7c7d_idx')],
+            },
+        ),
+    ]
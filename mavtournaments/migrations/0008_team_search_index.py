@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mavtournaments', '0007_bracketchange'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='team',
+            name='search_slug',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=300),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['tournament', 'search_slug'], name='mavtourname_tournam_099dbe_idx'),
+        ),
+    ]
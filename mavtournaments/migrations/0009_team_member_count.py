@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:13
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_member_count(apps, schema_editor):
+    Team = apps.get_model("mavtournaments", "Team")
+    teams = list(Team.objects.annotate(n=Count("membership")).filter(n__gt=0))
+    for team in teams:
+        team.member_count = team.n
+    Team.objects.bulk_update(teams, ["member_count"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mavtournaments', '0008_team_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='member_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_member_count, migrations.RunPython.noop),
+    ]
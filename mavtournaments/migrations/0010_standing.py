@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_standings(apps, schema_editor):
+    Match = apps.get_model("mavtournaments", "Match")
+    Standing = apps.get_model("mavtournaments", "Standing")
+    Team = apps.get_model("mavtournaments", "Team")
+
+    table = {
+        tid: {"tournament_id": tr, "wins": 0, "losses": 0, "byes": 0, "reached": 0}
+        for tid, tr in Team.objects.values_list("pk", "tournament_id")
+    }
+    rows = Match.objects.values_list("round__index", "team1_id", "team2_id", "winner_id", "is_bye")
+    for ri, t1, t2, winner, is_bye in rows.iterator():
+        for tid in (t1, t2):
+            if tid in table:
+                table[tid]["reached"] = max(table[tid]["reached"], ri)
+        if winner not in table:
+            continue
+        table[winner]["reached"] = max(table[winner]["reached"], ri + 1)
+        if is_bye:
+            table[winner]["byes"] += 1
+            continue
+        table[winner]["wins"] += 1
+        loser = t2 if winner == t1 else t1
+        if loser in table:
+            table[loser]["losses"] += 1
+    Standing.objects.bulk_create(
+        [Standing(team_id=tid, **values) for tid, values in table.items()], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mavtournaments', '0009_team_member_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('losses', models.PositiveIntegerField(default=0)),
+                ('byes', models.PositiveIntegerField(default=0)),
+                ('reached', models.PositiveSmallIntegerField(default=0)),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='standing', to='mavtournaments.team')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='mavtournaments.tournament')),
+            ],
+            options={
+                'ordering': ['-reached', 'losses', '-wins', 'team_id'],
+                'indexes': [models.Index(fields=['tournament', '-reached', 'losses', '-wins'], name='mavtourname_tournam_3eca14_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_standings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mavtournaments', '0010_standing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='cache_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mavtournaments', '0011_tournament_cache_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tournament',
+            index=models.Index(fields=['status', '-id'], name='mavtourname_status_02fb74_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 # mavtournaments/models.py
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils.text import slugify
 from django.contrib.auth import get_user_model
@@ -10,9 +11,15 @@ class Tournament(models.Model):
     SINGLE = "SINGLE"
     ELIM_CHOICES = [(SINGLE, "Single Elimination")]
 
+    # Bracket generation is bulk (one INSERT per round), so open brackets scale
+    # well past the old few-hundred-team comfort zone.
+    MAX_TEAM_CAP = 8192
+
     name = models.CharField(max_length=255)
     elimination_type = models.CharField(max_length=12, choices=ELIM_CHOICES, default=SINGLE)
-    team_cap = models.PositiveIntegerField(default=32)
+    team_cap = models.PositiveIntegerField(
+        default=32, validators=[MinValueValidator(2), MaxValueValidator(MAX_TEAM_CAP)]
+    )
     # NEW: per-tournament default team size (2 or 4 etc)
     default_team_size = models.PositiveSmallIntegerField(default=2)
     status = models.CharField(
@@ -22,6 +29,39 @@ class Tournament(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Denormalized bracket shape, maintained by services.bracket_builder so the
+    # hot paths never have to sort matches to find the final or the depth.
+    final_match = models.ForeignKey(
+        "Match", null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="+"
+    )
+    round_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    bracket_size = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped on every generation / recorded result; numbers the change log.
+    result_version = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped on any Team/Match/Round change (results included); keys the
+    # per-tournament cache (services.tournament_cache) and ETags.
+    cache_version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # keyset pagination of the index, with and without a status filter
+        indexes = [models.Index(fields=["status", "-id"])]
+
+    def save(self, *args, **kwargs):
+        # Editing a tournament (name, cap, ...) changes what cached payloads
+        # show, so bump cache_version in the same UPDATE. Both version
+        # counters are incremented with F() elsewhere and are never written
+        # back from a possibly stale instance.
+        bumped = not self._state.adding and not kwargs.get("force_insert")
+        if bumped:
+            fields = kwargs.get("update_fields")
+            if fields is None:
+                fields = [f.name for f in self._meta.concrete_fields if not f.primary_key]
+            kwargs["update_fields"] = (set(fields) - {"result_version"}) | {"cache_version"}
+            self.cache_version = models.F("cache_version") + 1
+        super().save(*args, **kwargs)
+        if bumped:
+            self.refresh_from_db(fields=["cache_version"])
+
     def __str__(self) -> str:
         return self.name
 
@@ -32,6 +72,9 @@ class Team(models.Model):
 
     # Team can be >2 members now; forms default to tournament.default_team_size
     max_players = models.PositiveSmallIntegerField(default=2)
+    # Maintained alongside TeamMembership writes (services.team_membership);
+    # joins claim a slot with a conditional UPDATE against max_players.
+    member_count = models.PositiveSmallIntegerField(default=0, editable=False)
 
     # Legacy text fields kept for quick entry / display fallbacks
     participant1 = models.CharField(max_length=120, blank=True, default="")
@@ -40,8 +83,9 @@ class Team(models.Model):
     wins = models.IntegerField(default=0)
     losses = models.IntegerField(default=0)
 
-    # search index
-    search_slug = models.CharField(max_length=300, editable=False, default="")
+    # search index (prefix lookups hit the B-tree; on SQLite substring lookups
+    # go through the mavtournaments_team_fts FTS5 table, see services.team_search)
+    search_slug = models.CharField(max_length=300, editable=False, default="", db_index=True)
 
     # Proper user membership (you already had TeamMembership; we keep/define it below)
     players = models.ManyToManyField(User, through="TeamMembership", related_name="teams")
@@ -49,9 +93,19 @@ class Team(models.Model):
     class Meta:
         unique_together = ("tournament", "name")
         ordering = ["name"]
+        indexes = [models.Index(fields=["tournament", "search_slug"])]
+
+    # Incremented with F() by services.team_membership and services.standings;
+    # never written back from a possibly stale instance.
+    COUNTER_FIELDS = {"member_count", "wins", "losses"}
 
     def save(self, *args, **kwargs):
         self.search_slug = slugify(self.name)
+        if not self._state.adding and not kwargs.get("force_insert"):
+            fields = kwargs.get("update_fields")
+            if fields is None:
+                fields = [f.name for f in self._meta.concrete_fields if not f.primary_key]
+            kwargs["update_fields"] = set(fields) - self.COUNTER_FIELDS
         super().save(*args, **kwargs)
 
     def __str__(self) -> str:
@@ -59,7 +113,7 @@ class Team(models.Model):
 
     @property
     def player_count(self) -> int:
-        return self.players.count()
+        return self.member_count
 
     def has_capacity(self) -> bool:
         return self.player_count < self.max_players
@@ -121,3 +175,64 @@ class Match(models.Model):
 
     def label(self) -> str:
         return f"R{self.round.index + 1}-M{self.slot + 1}"
+
+
+class Standing(models.Model):
+    """
+    Materialized leaderboard row, one per team. Kept current by
+    services.bracket_builder (atomic F() updates per result) and rebuildable
+    from Match rows with services.standings.rebuild_standings.
+
+    ``reached`` is how far the team got: the round index of its latest
+    match, plus one once it wins (or gets a bye through) that match, so the
+    champion has ``reached == Tournament.round_count``.
+    """
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="standings")
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name="standing")
+    wins = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    byes = models.PositiveIntegerField(default=0)
+    reached = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-reached", "losses", "-wins", "team_id"]
+        indexes = [models.Index(fields=["tournament", "-reached", "losses", "-wins"])]
+
+    def __str__(self) -> str:
+        return f"{self.team_id}: {self.wins}-{self.losses}"
+
+
+class BracketChange(models.Model):
+    """
+    Append-only, per-tournament change log. ``version`` is the tournament's
+    result_version after the change; every version has at least one row,
+    so a gap right after a client's version means the log was compacted.
+    """
+    GENERATED = "GENERATED"
+    WINNER = "WINNER"
+    ADVANCE = "ADVANCE"
+    FINISHED = "FINISHED"
+    KIND_CHOICES = [
+        (GENERATED, "Bracket generated"),
+        (WINNER, "Winner set"),
+        (ADVANCE, "Team advanced"),
+        (FINISHED, "Tournament finished"),
+    ]
+
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="changes")
+    version = models.PositiveIntegerField()
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    # No DB constraint: the log is wiped together with the matches on regeneration,
+    # and skipping the FK keeps match deletes from scanning it.
+    match = models.ForeignKey(
+        Match, null=True, blank=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["version", "id"]
+        indexes = [models.Index(fields=["tournament", "version"])]
+
+    def __str__(self) -> str:
+        return f"{self.tournament_id}@{self.version} {self.kind}"
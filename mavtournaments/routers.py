@@ -0,0 +1,100 @@
+# mavtournaments/routers.py
+"""
+Primary/replica routing: ``read_from_replica`` views read tournament data
+from ``replica``; writes, auth and recent writers stay on ``default``.
+"""
+import functools
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = "default"
+REPLICA = "replica"
+REPLICATED_APPS = {"mavtournaments"}
+STICKY_COOKIE = "mb_primary"
+STICKY_SECONDS = getattr(settings, "MAVBRACKET_REPLICA_STICKY_SECONDS", 10)
+
+
+class RequestDBState:
+    """Per-request routing flags (mutable, so sync_to_async hops share it)."""
+    __slots__ = ("sticky", "replica", "wrote")
+
+    def __init__(self, sticky: bool = False):
+        self.sticky = sticky      # this client wrote recently: primary only
+        self.replica = False      # inside a read_from_replica view
+        self.wrote = False        # something was written during this request
+
+
+_state: ContextVar = ContextVar("mavbracket_db_state", default=None)
+
+
+def begin_request(sticky: bool):
+    return _state.set(RequestDBState(sticky))
+
+
+def end_request(token) -> bool:
+    """Forget the request's state; return whether it wrote anything."""
+    state = _state.get()
+    _state.reset(token)
+    return bool(state and state.wrote)
+
+
+def replica_configured() -> bool:
+    return REPLICA in connections.settings
+
+
+def read_from_replica(view):
+    """View decorator: tournament reads in this view may use the replica."""
+    def _enter():
+        state = _state.get()
+        if state is not None and not state.sticky:
+            state.replica = True
+        return state
+
+    def _exit(state):
+        if state is not None:
+            state.replica = False
+
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def _wrapped(request, *args, **kwargs):
+            state = _enter()
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _exit(state)
+    else:
+        @functools.wraps(view)
+        def _wrapped(request, *args, **kwargs):
+            state = _enter()
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                _exit(state)
+    return _wrapped
+
+
+class ReplicaRouter:
+    """Listed in settings.DATABASE_ROUTERS; a no-op without a ``replica`` alias."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (state is not None and state.replica and not state.wrote
+                and model._meta.app_label in REPLICATED_APPS and replica_configured()):
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return {obj1._state.db, obj2._state.db} <= {PRIMARY, REPLICA}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets its schema (and data) from the primary
+        return db == PRIMARY
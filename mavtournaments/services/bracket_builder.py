@@ -1,106 +1,230 @@
 #mavtournaments/services/bracket_builder.py
-import math
 import random
-from typing import List
+from typing import List, Optional, Tuple
+from django.conf import settings
 from django.db import transaction
-from mavtournaments.models import Tournament, Round, Match, Team
+from django.db.models import F
+from mavtournaments.models import BracketChange, Tournament, Round, Match, Team
+
+from . import snapshots
+from .broadcast import get_broadcaster
+from .standings import rebuild_standings, record_result
 
 def _next_power_of_two(n: int) -> int:
     return 1 << (n - 1).bit_length()
 
+def _first_round_pairs(team_ids: List[int], M: int, seed_method: str) -> List[Tuple[Optional[int], Optional[int]]]:
+    n = len(team_ids)
+    if seed_method == "RANDOM":
+        random.shuffle(team_ids)
+        first_pairs = []
+        for i in range(M // 2):
+            t1 = team_ids[2*i] if 2*i < n else None
+            t2 = team_ids[2*i+1] if 2*i+1 < n else None
+            first_pairs.append((t1, t2))
+        return first_pairs
+
+    # POWER: 1 vs M, 2 vs M-1, ...
+    pairs = [(s, M + 1 - s) for s in range(1, M // 2 + 1)]
+    return [
+        (team_ids[a - 1] if a <= n else None, team_ids[b - 1] if b <= n else None)
+        for (a, b) in pairs
+    ]
+
+def _bump_version(t: Tournament, **fields) -> None:
+    """
+    Increment ``result_version`` and ``cache_version`` atomically (plus any
+    extra columns) and keep the in-memory instance in step. Callers must be
+    inside a transaction.
+    """
+    qs = Tournament.objects.filter(pk=t.pk)
+    qs.update(result_version=F("result_version") + 1, cache_version=F("cache_version") + 1, **fields)
+    # re-read rather than += 1: the change log needs the exact committed number,
+    # and the row is write-locked for the rest of this transaction
+    t.result_version, t.cache_version = qs.values_list("result_version", "cache_version").get()
+    for name, value in fields.items():
+        setattr(t, name, value)
+
+# How many versions of history bracket_data?since= can still answer from.
+CHANGE_LOG_KEEP = getattr(settings, "MAVBRACKET_CHANGE_LOG_KEEP", 1000)
+CHANGE_LOG_COMPACT_EVERY = 100
+
+def _record_changes(t: Tournament, events: List[dict]) -> None:
+    """
+    Append this version's deltas to the change log (one INSERT), push them
+    to live subscribers once the transaction commits and queue a snapshot
+    rewrite (a no-op unless snapshots are enabled).
+    """
+    version = t.result_version
+    BracketChange.objects.bulk_create([
+        BracketChange(tournament_id=t.pk, version=version, kind=ev["type"].upper(),
+                      match_id=ev.get("match"), payload=ev)
+        for ev in events
+    ])
+    if version % CHANGE_LOG_COMPACT_EVERY == 0:
+        compact_changes(t)
+
+    message = {"version": version, "events": events}
+    transaction.on_commit(lambda: get_broadcaster().publish(t.pk, message))
+    snapshots.schedule(t.pk)
+
+def compact_changes(t: Tournament, keep: int = CHANGE_LOG_KEEP) -> int:
+    """Drop log rows more than ``keep`` versions old; older clients must resync."""
+    deleted, _ = BracketChange.objects.filter(tournament=t, version__lte=t.result_version - keep).delete()
+    return deleted
+
+def _resolve_byes(layers: List[List[Match]], first_pairs) -> None:
+    """
+    Work out every bye in one bottom-up pass over the in-memory tree.
+
+    A match is a bye when exactly one of its two feeders can ever produce a
+    team (first round: exactly one team seeded). If that team is already
+    known it is recorded as the winner and copied into the parent match;
+    otherwise the match stays flagged so set_winner auto-advances it later.
+    """
+    live = [t1 is not None or t2 is not None for (t1, t2) in first_pairs]
+    for m in layers[0]:
+        if m.is_bye:
+            m.winner_id = m.team1_id or m.team2_id
+
+    for ri in range(1, len(layers)):
+        prev = layers[ri - 1]
+        next_live = []
+        for i, m in enumerate(layers[ri]):
+            a, b = prev[2*i], prev[2*i+1]
+            m.team1_id, m.team2_id = a.winner_id, b.winner_id
+            m.is_bye = live[2*i] != live[2*i+1]
+            if m.is_bye:
+                m.winner_id = m.team1_id or m.team2_id
+            next_live.append(live[2*i] or live[2*i+1])
+        live = next_live
+
 @transaction.atomic
 def generate_single_elim(t: Tournament, seed_method: str = "POWER"):
-    # wipe existing
-    Match.objects.filter(tournament=t).delete()
-    Round.objects.filter(tournament=t).delete()
+    """
+    Build the whole bracket tree in memory, then persist it with one INSERT
+    for the rounds and one INSERT per round for the matches.
 
-    teams: List[Team] = list(t.teams.all())
-    n = len(teams)
+    Byes (first round and mid-tree) are resolved in memory before anything
+    is written, so a sparse field costs no more queries than a full one.
+    Rounds are written final-first so every match already knows the primary
+    key of its ``next_win`` target when it is inserted; no follow-up UPDATEs
+    are needed to wire the tree, whatever the bracket size.
+    """
+    # wipe existing (the change log restarts with the GENERATED row below):
+    # clear the pointers into the old tree with one UPDATE each, then one
+    # DELETE per table; QuerySet.delete() would collect every match and null
+    # its next_win in batches first
+    Tournament.objects.filter(pk=t.pk).update(final_match=None)
+    Match.objects.filter(tournament=t, next_win__isnull=False).update(next_win=None)
+    for model in (BracketChange, Match, Round):
+        old = model.objects.filter(tournament=t)
+        old._raw_delete(old.db)
+
+    team_ids: List[int] = list(t.teams.values_list("pk", flat=True))
+    n = len(team_ids)
     if n < 2:
+        rebuild_standings(t, [])
+        _bump_version(t, final_match=None, round_count=0, bracket_size=0)
+        _record_changes(t, [{"type": "generated"}])
         return
 
     M = _next_power_of_two(n)          # bracket size (power of two)
-    rounds = int(math.log2(M))
+    rounds = M.bit_length() - 1
 
     # rounds
-    r_objs = [Round.objects.create(tournament=t, index=i) for i in range(rounds)]
+    r_objs = Round.objects.bulk_create([Round(tournament=t, index=i) for i in range(rounds)])
 
-    # seeding
-    if seed_method == "RANDOM":
-        random.shuffle(teams)
-        first_pairs = []
-        for i in range(M // 2):
-            t1 = teams[2*i] if 2*i < n else None
-            t2 = teams[2*i+1] if 2*i+1 < n else None
-            first_pairs.append((t1, t2))
-    else:
-        # POWER: 1 vs M, 2 vs M-1, ...
-        seeds = list(range(1, M + 1))
-        pairs = [(s, M + 1 - s) for s in range(1, M // 2 + 1)]
-        slots = {seed: (teams[seed - 1] if seed <= n else None) for seed in seeds}
-        first_pairs = [(slots[a], slots[b]) for (a, b) in pairs]
-
-    # create first round matches
-    prev_round_matches = []
-    for i, (t1, t2) in enumerate(first_pairs):
-        is_bye = (t1 is None) ^ (t2 is None)
-        m = Match.objects.create(
-            tournament=t, round=r_objs[0], slot=i, team1=t1, team2=t2, is_bye=is_bye
-        )
-        prev_round_matches.append(m)
-
-    # create remaining rounds and wire next_win pointers
+    # matches, layered by round (layers[0] is the first round)
+    first_pairs = _first_round_pairs(team_ids, M, seed_method)
+    # (raw *_id assignment keeps model construction cheap for 8k+ matches)
+    layers: List[List[Match]] = [[
+        Match(tournament_id=t.pk, round_id=r_objs[0].pk, slot=i, team1_id=t1, team2_id=t2,
+              is_bye=(t1 is None) ^ (t2 is None))
+        for i, (t1, t2) in enumerate(first_pairs)
+    ]]
     for ri in range(1, rounds):
-        current = []
-        for i in range(len(prev_round_matches) // 2):
-            m = Match.objects.create(tournament=t, round=r_objs[ri], slot=i)
-            a = prev_round_matches[2*i]
-            b = prev_round_matches[2*i+1]
-            a.next_win = m; a.save(update_fields=["next_win"])
-            b.next_win = m; b.save(update_fields=["next_win"])
-            current.append(m)
-        prev_round_matches = current
-
-    # resolve byes automatically
-    for m in Match.objects.filter(tournament=t, round__index=0, is_bye=True):
-        auto = m.team1 or m.team2
-        if auto:
-            set_winner(m, auto, cascade=True)
-
-    t.status = "ACTIVE"
-    t.save(update_fields=["status"])
-
-def set_winner(match: Match, winner: Team, cascade: bool = True):
-    loser = match.team2 if match.team1 == winner else match.team1
+        r_id = r_objs[ri].pk
+        layers.append([Match(tournament_id=t.pk, round_id=r_id, slot=i) for i in range(len(layers[-1]) // 2)])
+
+    _resolve_byes(layers, first_pairs)
+    rebuild_standings(t, (
+        (ri, m.team1_id, m.team2_id, m.winner_id, m.is_bye)
+        for ri, layer in enumerate(layers) for m in layer
+    ))
+
+    # persist final-first so next_win targets already have primary keys
+    for ri in reversed(range(rounds)):
+        if ri + 1 < rounds:
+            parents = layers[ri + 1]
+            for i, m in enumerate(layers[ri]):
+                m.next_win_id = parents[i // 2].pk
+        Match.objects.bulk_create(layers[ri])
+
+    _bump_version(
+        t, status="ACTIVE", final_match=layers[-1][0], round_count=rounds, bracket_size=M,
+    )
+    _record_changes(t, [{"type": "generated"}])
+
+class MatchConflict(Exception):
+    """The match was already decided with a different winner."""
+
+
+class InvalidWinner(ValueError):
+    """The match cannot be decided yet, or not for this team."""
+
+
+@transaction.atomic
+def set_winner(match: Match, winner: Team, cascade: bool = True) -> bool:
+    """
+    Claim ``winner`` for ``match`` with a compare-and-set UPDATE and, with
+    ``cascade``, advance it through any byes; False if it was already recorded.
+    """
+    if not match.is_bye and (match.team1_id is None or match.team2_id is None):
+        raise InvalidWinner(f"{match.label()} is still waiting for an opponent.")
+    if winner is None or winner.pk not in (match.team1_id, match.team2_id):
+        raise InvalidWinner(f"{winner} is not playing in {match.label()}.")
+    loser = match.team2 if match.team1_id == winner.pk else match.team1
+    # compare-and-set instead of a row lock: concurrent submissions never wait
+    claimed = Match.objects.filter(pk=match.pk, winner__isnull=True).update(winner=winner, loser=loser)
+    if not claimed:
+        current = Match.objects.filter(pk=match.pk).values_list("winner_id", flat=True).first()
+        if current == winner.pk:
+            return False
+        raise MatchConflict(f"{match.label()} was already decided.")
     match.winner = winner
     match.loser = loser
-    match.save(update_fields=["winner", "loser"])
-
-    if winner:
-        winner.wins += 1; winner.save(update_fields=["wins"])
-    if loser:
-        loser.losses += 1; loser.save(update_fields=["losses"])
+    events = [{"type": "winner", "match": match.pk, "winner": winner.pk,
+               "loser": loser.pk if loser else None}]
 
     # advance
-    if cascade and match.next_win:
-        target = match.next_win
-        if target.team1 is None:
-            target.team1 = winner
-        elif target.team2 is None:
-            target.team2 = winner
-        target.save(update_fields=["team1","team2"])
-
-        # propagate unexpected byes mid-tree
-        if (target.team1 is None) ^ (target.team2 is None):
-            target.is_bye = True
-            target.save(update_fields=["is_bye"])
-            auto = target.team1 or target.team2
-            if auto:
-                set_winner(target, auto, cascade=True)
-
-    # finish flag if this was the final
-    final = Match.objects.filter(tournament=match.tournament).order_by("-round__index","slot").first()
-    if final and final.id == match.id and match.winner:
-        trn = match.tournament
-        trn.status = "FINISHED"
-        trn.save(update_fields=["status"])
+    decided = match
+    byes_after = 0
+    while cascade and decided.next_win_id:
+        target = decided.next_win
+        field = "team1" if decided.slot % 2 == 0 else "team2"
+        setattr(target, field, winner)
+        events.append({"type": "advance", "match": target.pk, "slot": field,
+                       "team": winner.pk, "name": winner.name})
+        # queryset updates: no per-save signals, _bump_version below covers caches
+        if not target.is_bye:
+            Match.objects.filter(pk=target.pk).update(**{field: winner})
+            break
+        target.winner = winner
+        Match.objects.filter(pk=target.pk).update(**{field: winner, "winner": winner})
+        events.append({"type": "winner", "match": target.pk, "winner": winner.pk, "loser": None})
+        decided = target
+        byes_after += 1
+
+    record_result(match.round.index, winner.pk, loser.pk if loser else None,
+                  counted=not match.is_bye, byes_after=byes_after)
+
+    # finish flag if this was the final (O(1) via the denormalized pointer)
+    trn = match.tournament
+    if decided.pk == trn.final_match_id and decided.winner_id:
+        _bump_version(trn, status="FINISHED")
+        events.append({"type": "finished", "winner": decided.winner_id})
+    else:
+        _bump_version(trn)
+    _record_changes(trn, events)
+    return True
@@ -0,0 +1,61 @@
+# mavtournaments/services/bracket_layout.py
+from django.conf import settings
+
+from mavtournaments.models import Tournament
+
+from .bracket_serializer import bracket_matches
+
+# SVG geometry (user units)
+COL_W = 350      # horizontal distance between rounds
+ROW_H = 120      # vertical pitch of first-round matches
+BOX_W = 280
+BOX_H = 60
+MARGIN = 40
+
+# from this many teams pages draw on a canvas instead of one SVG group per match
+CANVAS_MIN_TEAMS = getattr(settings, "MAVBRACKET_CANVAS_MIN_TEAMS", 128)
+
+
+def layout_bracket(t: Tournament, matches=None) -> dict:
+    """
+    Place every match of ``t`` on the SVG canvas.
+
+    First-round matches sit on a fixed grid; a later match is centred on the
+    two matches that feed it, which for slot ``s`` of round ``r`` is
+    ``(s * 2**r + (2**r - 1) / 2)`` grid rows down. Everything is computed
+    here so the template only prints numbers.
+    """
+    if matches is None:
+        matches = bracket_matches(t)
+
+    rounds = [{"index": i, "label": f"R{i + 1}", "matches": []} for i in range(t.round_count)]
+    for m in matches:
+        ri = m.round.index
+        span = 1 << ri
+        x = MARGIN + ri * COL_W
+        y = MARGIN + int((m.slot * span + (span - 1) / 2) * ROW_H)
+        rounds[ri]["matches"].append({
+            "m": m, "x": x, "y": y,
+            # text anchors: names on the left, "win" links on the right
+            "name_x": x + 10, "win_x": x + BOX_W - 30, "line1_y": y + 22, "line2_y": y + 44,
+        })
+
+    first_round = max(t.bracket_size // 2, 1)
+    return {
+        "rounds": rounds,
+        "svg_w": 2 * MARGIN + max(t.round_count - 1, 0) * COL_W + BOX_W,
+        "svg_h": 2 * MARGIN + (first_round - 1) * ROW_H + BOX_H,
+        "box_w": BOX_W,
+        "box_h": BOX_H,
+    }
+
+
+def layout_geometry(t: Tournament) -> dict:
+    """
+    The constants ``layout_bracket`` places matches with, for client-side
+    renderers (bracket_canvas.js) that compute the same positions themselves.
+    """
+    return {
+        "col_w": COL_W, "row_h": ROW_H, "box_w": BOX_W, "box_h": BOX_H, "margin": MARGIN,
+        "rounds": t.round_count, "bracket_size": t.bracket_size,
+    }
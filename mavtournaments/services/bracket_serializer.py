@@ -0,0 +1,150 @@
+# mavtournaments/services/bracket_serializer.py
+from typing import Optional
+
+from mavtournaments.models import BracketChange, Tournament, Match
+
+
+def _team(team) -> Optional[dict]:
+    return {"id": team.pk, "name": team.name} if team else None
+
+
+def _match(m: Match) -> dict:
+    return {
+        "id": m.pk,
+        "slot": m.slot,
+        "label": f"R{m.round.index + 1}-M{m.slot + 1}",
+        "team1": _team(m.team1),
+        "team2": _team(m.team2),
+        "winner": m.winner_id,
+        "is_bye": m.is_bye,
+        "next": m.next_win_id,
+    }
+
+
+def _score(m: Match) -> list:
+    """jquery-bracket score pair: 1 for the winner, 0 for the other side."""
+    if not m.winner_id:
+        return [None, None]
+    return [1, 0] if m.winner_id == m.team1_id else [0, 1]
+
+
+def bracket_matches(t: Tournament):
+    """Every match of ``t`` with its round and teams joined in: one query."""
+    return (
+        Match.objects.filter(tournament=t)
+        .select_related("round", "team1", "team2", "winner")
+        .order_by("round__index", "slot")
+    )
+
+
+def _tournament(t: Tournament) -> dict:
+    return {
+        "id": t.pk,
+        "name": t.name,
+        "status": t.status,
+        "version": t.result_version,
+        "round_count": t.round_count,
+        "bracket_size": t.bracket_size,
+        "final_match": t.final_match_id,
+    }
+
+
+def serialize_bracket(t: Tournament) -> dict:
+    """
+    Full bracket as plain data for the JSON API.
+
+    ``rounds`` is the canonical shape; ``teams``/``results`` mirror it in the
+    layout jquery-bracket expects (first-round pairs, per-round score pairs).
+    """
+    rounds = [{"index": i, "label": f"R{i + 1}", "matches": []} for i in range(t.round_count)]
+    results = [[] for _ in range(t.round_count)]
+    teams = []
+    for m in bracket_matches(t):
+        ri = m.round.index
+        rounds[ri]["matches"].append(_match(m))
+        results[ri].append(_score(m))
+        if ri == 0:
+            teams.append([m.team1.name if m.team1 else None, m.team2.name if m.team2 else None])
+
+    return {
+        "tournament": _tournament(t),
+        "rounds": rounds,
+        "teams": teams,
+        "results": [results],
+    }
+
+
+COLUMNAR_FORMAT = 1
+
+
+def serialize_bracket_columnar(t: Tournament) -> dict:
+    """
+    The same bracket as ``serialize_bracket``, as parallel integer columns.
+
+    Team names are sent once in ``teams``; a match refers to a team by its
+    1-based index there (0 = empty slot). Per round, ``team1``/``team2`` hold
+    those indexes, ``winner`` is 0 (undecided), 1 (team1) or 2 (team2),
+    ``bye`` is 0/1, and ``id`` holds match ids delta-encoded (first id, then
+    differences, mostly 1s). Columns are indexed by slot; the match fed by
+    slot ``s`` is slot ``s // 2`` of the next round, so no links are sent.
+    """
+    team_ids, team_names, index = [], [], {}
+
+    def ref(team) -> int:
+        if team is None:
+            return 0
+        if team.pk not in index:
+            team_ids.append(team.pk)
+            team_names.append(team.name)
+            index[team.pk] = len(team_ids)
+        return index[team.pk]
+
+    rounds = []
+    for i in range(t.round_count):
+        n = max(t.bracket_size >> (i + 1), 1)
+        rounds.append({"id": [0] * n, "team1": [0] * n, "team2": [0] * n, "winner": [0] * n, "bye": [0] * n})
+    for m in bracket_matches(t):
+        col, s = rounds[m.round.index], m.slot
+        col["id"][s] = m.pk
+        col["team1"][s] = ref(m.team1)
+        col["team2"][s] = ref(m.team2)
+        col["winner"][s] = 0 if not m.winner_id else (1 if m.winner_id == m.team1_id else 2)
+        col["bye"][s] = int(m.is_bye)
+    for col in rounds:
+        ids = col["id"]
+        col["id"] = ids[:1] + [b - a for a, b in zip(ids, ids[1:])]
+
+    return {
+        "format": COLUMNAR_FORMAT,
+        "tournament": _tournament(t),
+        "teams": {"id": team_ids, "name": team_names},
+        "rounds": rounds,
+    }
+
+
+def serialize_changes(t: Tournament, since: int) -> dict:
+    """
+    Matches that changed after version ``since``, read off the change log.
+
+    ``resync`` is true when the log cannot answer: the client is ahead of
+    the server, the bracket was regenerated, or the versions right after
+    ``since`` have been compacted away. The client should then fetch the
+    full bracket.
+    """
+    payload = {"tournament": _tournament(t), "since": since, "resync": False, "matches": []}
+    if since == t.result_version:
+        return payload
+
+    rows = list(
+        BracketChange.objects.filter(tournament=t, version__gt=since)
+        .order_by("version")
+        .values_list("version", "kind", "match_id")
+    )
+    if (since > t.result_version or not rows or rows[0][0] != since + 1
+            or any(kind == BracketChange.GENERATED for _, kind, _ in rows)):
+        payload["resync"] = True
+        return payload
+
+    changed = {match_id for _, _, match_id in rows if match_id}
+    payload["matches"] = [_match(m) for m in bracket_matches(t).filter(pk__in=changed)]
+    return payload
@@ -0,0 +1,105 @@
+# mavtournaments/services/broadcast.py
+"""
+Fan-out of bracket deltas to live (Server-Sent Events) subscribers.
+
+The default broadcaster lives in-process: each connected client owns a
+small asyncio.Queue on the server's event loop, so an idle connection costs
+a coroutine, not a thread. ``settings.MAVBRACKET_BROADCASTER`` may name a
+different class with the same ``publish``/``subscribe`` interface (e.g. a
+Redis-backed one for multi-process deployments, or a stand-in for tests).
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_BROADCASTER = "mavtournaments.services.broadcast.InProcessBroadcaster"
+
+
+class Subscription:
+    """One client's view of a tournament's delta stream."""
+
+    def __init__(self, broadcaster, tournament_id: int, maxsize: int):
+        self.broadcaster = broadcaster
+        self.tournament_id = tournament_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _offer(self, message: dict) -> None:
+        # runs on the subscriber's loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # a client this far behind must resync; tell it once and stop queueing
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    async def get(self, timeout: float):
+        """Next message, or None after ``timeout`` seconds of silence."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broadcaster.unsubscribe(self)
+
+
+class InProcessBroadcaster:
+    """Broadcaster for a single server process; no external services needed."""
+
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs = defaultdict(set)
+
+    def subscribe(self, tournament_id: int) -> Subscription:
+        """Must be called from the event loop that will consume the stream."""
+        sub = Subscription(self, tournament_id, self.queue_size)
+        with self._lock:
+            self._subs[tournament_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.tournament_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.tournament_id]
+
+    def subscriber_count(self, tournament_id: int) -> int:
+        with self._lock:
+            return len(self._subs.get(tournament_id, ()))
+
+    def publish(self, tournament_id: int, message: dict) -> None:
+        """Thread-safe: may be called from sync request threads."""
+        with self._lock:
+            subs = list(self._subs.get(tournament_id, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, message)
+            except RuntimeError:
+                # the subscriber's loop has shut down
+                self.unsubscribe(sub)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                path = getattr(settings, "MAVBRACKET_BROADCASTER", DEFAULT_BROADCASTER)
+                _broadcaster = import_string(path)()
+    return _broadcaster
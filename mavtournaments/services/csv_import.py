@@ -0,0 +1,263 @@
+# mavtournaments/services/csv_import.py
+"""
+Streaming team import: rows are read line by line and written in batches,
+a few queries per batch, so memory stays bounded however long the roster.
+"""
+import codecs
+import csv
+import io
+import os
+import re
+import secrets
+import tempfile
+import time
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.text import slugify
+
+from accounts.models import Profile
+from mavtournaments.models import Team, TeamMembership, Tournament
+
+from .tournament_cache import bump
+
+User = get_user_model()
+
+SNIFF_BYTES = 16 * 1024
+BATCH_SIZE = 500
+
+_username_validator = UnicodeUsernameValidator()
+
+# Uploads are staged on disk between the preview and confirm requests;
+# previews that were never confirmed are removed after STAGING_MAX_AGE seconds.
+STAGING_DIR = os.path.join(tempfile.gettempdir(), "mavbracket-imports")
+STAGING_MAX_AGE = getattr(settings, "MAVBRACKET_IMPORT_STAGING_MAX_AGE", 24 * 3600)
+_TOKEN_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def prune_staged(max_age: float = STAGING_MAX_AGE) -> int:
+    """Delete staged uploads older than ``max_age`` seconds; returns how many."""
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(STAGING_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.name.endswith(".csv") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass  # raced with another request's cleanup
+    return removed
+
+
+def stage_upload(uploaded=None, text: str = "") -> str:
+    """Copy an UploadedFile (chunk by chunk) or pasted text to disk; return its token."""
+    os.makedirs(STAGING_DIR, exist_ok=True)
+    prune_staged()
+    token = secrets.token_hex(16)
+    with open(staged_path(token), "wb") as out:
+        if uploaded is not None:
+            for chunk in uploaded.chunks():
+                out.write(chunk)
+        else:
+            out.write(text.encode("utf-8"))
+    return token
+
+
+def staged_path(token: str) -> str:
+    if not _TOKEN_RE.match(token or ""):
+        raise ValueError("bad import token")
+    return os.path.join(STAGING_DIR, f"{token}.csv")
+
+
+def discard_staged(token: str) -> None:
+    try:
+        os.remove(staged_path(token))
+    except (OSError, ValueError):
+        pass
+
+
+def _decoded_lines(byte_lines: Iterable[bytes]) -> Iterator[str]:
+    # utf-8-sig drops the BOM Excel likes to prepend
+    return codecs.iterdecode(byte_lines, "utf-8-sig", errors="replace")
+
+
+def _sniff(sample: str) -> str:
+    """Pick the cell delimiter once from the start of the input."""
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+    except csv.Error:
+        # ragged rows (teams of different sizes) can defeat the sniffer
+        return "\t" if sample.count("\t") > sample.count(",") else ","
+
+
+def iter_team_rows(byte_lines: Iterable[bytes]) -> Iterator[dict]:
+    """
+    Yield ``{"line", "team", "usernames"}`` for every non-blank input line.
+
+    ``byte_lines`` is any iterable of encoded lines: an UploadedFile, an open
+    binary file, ... Lines mixing both accepted formats are handled in the
+    same pass: with a comma dialect, a ``;`` in the first cell separates the
+    team name from the first username.
+    """
+    lines = _decoded_lines(byte_lines)
+    head: List[str] = []
+    size = 0
+    for line in lines:
+        head.append(line)
+        size += len(line)
+        if size >= SNIFF_BYTES:
+            break
+    delimiter = _sniff("".join(head))
+
+    def all_lines():
+        yield from head
+        yield from lines
+
+    for lineno, cells in enumerate(csv.reader(all_lines(), delimiter=delimiter), start=1):
+        if not cells or not any(c.strip() for c in cells):
+            continue
+        first, rest = cells[0], cells[1:]
+        if delimiter == "," and ";" in first:
+            first, extra = first.split(";", 1)
+            rest = [extra] + rest
+        usernames = []
+        for cell in rest:
+            for name in cell.replace(";", ",").split(","):
+                name = name.strip()
+                if name and name not in usernames:
+                    usernames.append(name)
+        yield {"line": lineno, "team": first.strip(), "usernames": usernames}
+
+
+def iter_team_rows_from_text(text: str) -> Iterator[dict]:
+    return iter_team_rows(io.BytesIO(text.encode("utf-8")))
+
+
+def _batches(rows: Iterable[dict], size: int = BATCH_SIZE) -> Iterator[List[dict]]:
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _check_batch(t: Tournament, batch: List[dict], seen_teams: set, max_players: int,
+                 create_missing_users: bool) -> dict:
+    """
+    Annotate every row in ``batch`` with ``exists``/``missing`` usernames and
+    an ``error`` (or None). Costs two queries per batch. Returns the users
+    found, keyed by username.
+    """
+    names = {u for row in batch for u in row["usernames"]}
+    users = {u.username: u for u in User.objects.filter(username__in=names).only("pk", "username")}
+    taken = set(
+        Team.objects.filter(tournament=t, name__in=[row["team"] for row in batch])
+        .values_list("name", flat=True)
+    )
+
+    for row in batch:
+        row["exists"] = [u for u in row["usernames"] if u in users]
+        row["missing"] = [u for u in row["usernames"] if u not in users]
+        row["error"] = None
+        team = row["team"]
+        if not team:
+            row["error"] = "Missing team name."
+        elif len(team) > Team._meta.get_field("name").max_length:
+            row["error"] = "Team name is too long."
+        elif team in taken:
+            row["error"] = "A team with this name already exists."
+        elif team in seen_teams:
+            row["error"] = "Team listed more than once in this import."
+        elif not row["usernames"]:
+            row["error"] = "No players listed."
+        elif len(row["usernames"]) > max_players:
+            row["error"] = f"{len(row['usernames'])} players exceed the limit of {max_players}."
+        elif row["missing"] and not create_missing_users:
+            row["error"] = "Unknown usernames: " + ", ".join(row["missing"])
+        elif row["missing"]:
+            for name in row["missing"]:
+                try:
+                    _username_validator(name)
+                except ValidationError:
+                    row["error"] = f"Invalid username: {name}"
+                    break
+                if len(name) > User._meta.get_field("username").max_length:
+                    row["error"] = f"Username too long: {name}"
+                    break
+        seen_teams.add(team)
+    return users
+
+
+def preview_import(t: Tournament, rows: Iterable[dict], max_players: int,
+                   create_missing_users: bool, show_valid: int = 100) -> dict:
+    """
+    Dry run: validate every row without writing anything.
+
+    Every invalid row is returned, plus the first ``show_valid`` valid ones,
+    so the preview page stays small for huge rosters.
+    """
+    seen_teams = set()
+    shown, total, errors = [], 0, 0
+    for batch in _batches(rows):
+        _check_batch(t, batch, seen_teams, max_players, create_missing_users)
+        for row in batch:
+            total += 1
+            if row["error"]:
+                errors += 1
+                shown.append(row)
+            elif total - errors <= show_valid:
+                shown.append(row)
+    return {"rows": shown, "total": total, "errors": errors, "valid": total - errors}
+
+
+@transaction.atomic
+def import_teams(t: Tournament, rows: Iterable[dict], max_players: int,
+                 create_missing_users: bool) -> dict:
+    """
+    Create the valid rows' teams (and, if allowed, their missing users) in
+    bulk; invalid rows are skipped. Per batch: two lookups and at most four
+    INSERTs, whatever the batch size.
+    """
+    seen_teams = set()
+    unusable = make_password(None)   # bulk-created users must reset their password
+    created_teams = created_users = skipped = 0
+
+    for batch in _batches(rows):
+        users = _check_batch(t, batch, seen_teams, max_players, create_missing_users)
+        good = [row for row in batch if not row["error"]]
+        skipped += len(batch) - len(good)
+        if not good:
+            continue
+
+        if create_missing_users:
+            new_names = list(dict.fromkeys(u for row in good for u in row["missing"]))
+            new_users = User.objects.bulk_create(
+                [User(username=name, password=unusable) for name in new_names]
+            )
+            Profile.objects.ensure_for(new_users)
+            users.update((u.username, u) for u in new_users)
+            created_users += len(new_users)
+
+        teams = Team.objects.bulk_create([
+            Team(tournament_id=t.pk, name=row["team"], search_slug=slugify(row["team"]),
+                 max_players=max_players, member_count=len(row["usernames"]))
+            for row in good
+        ])
+        TeamMembership.objects.bulk_create([
+            TeamMembership(team_id=team.pk, user_id=users[name].pk)
+            for team, row in zip(teams, good)
+            for name in row["usernames"]
+        ])
+        created_teams += len(teams)
+
+    if created_teams:
+        bump(t.pk)
+    return {"teams": created_teams, "users": created_users, "skipped": skipped}
@@ -0,0 +1,120 @@
+# mavtournaments/services/request_metrics.py
+"""
+Per-request query/timing instrumentation (see
+``middleware.ServerTimingMiddleware``) and a rolling per-URL-name aggregate.
+
+Costs per request: one execute_wrapper call per query and one wrapper call
+per top-level template render; aggregation is a few additions and a
+bounded deque append under a lock. The aggregate is per process.
+"""
+import functools
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+
+WINDOW = getattr(settings, "MAVBRACKET_TIMING_WINDOW", 200)  # recent requests kept per URL name
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "db", "template", "depth")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0         # seconds
+        self.template = 0.0   # seconds, outermost renders only
+        self.depth = 0
+
+
+current: ContextVar = ContextVar("mavbracket_request_metrics", default=None)
+
+
+def query_timer(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook."""
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db += time.perf_counter() - start
+        metrics.queries += 1
+
+
+def timed_render(render):
+    """Wrap a template ``render`` method; nested renders count once."""
+    @functools.wraps(render)
+    def wrapper(*args, **kwargs):
+        metrics = current.get()
+        if metrics is None:
+            return render(*args, **kwargs)
+        metrics.depth += 1
+        start = time.perf_counter()
+        try:
+            return render(*args, **kwargs)
+        finally:
+            metrics.depth -= 1
+            if not metrics.depth:
+                metrics.template += time.perf_counter() - start
+    wrapper._mavbracket_timed = True
+    return wrapper
+
+
+class _Aggregate:
+    __slots__ = ("count", "queries", "db", "template", "total", "max_total", "recent")
+
+    def __init__(self):
+        self.count = self.queries = 0
+        self.db = self.template = self.total = self.max_total = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def as_dict(self) -> dict:
+        recent = sorted(self.recent)
+        n = self.count
+
+        def pct(p):
+            return round(recent[min(int(len(recent) * p), len(recent) - 1)] * 1000, 2) if recent else None
+
+        return {
+            "requests": n,
+            "avg_queries": round(self.queries / n, 1),
+            "avg_db_ms": round(self.db / n * 1000, 2),
+            "avg_template_ms": round(self.template / n * 1000, 2),
+            "avg_total_ms": round(self.total / n * 1000, 2),
+            "max_total_ms": round(self.max_total * 1000, 2),
+            "p50_total_ms": pct(0.5),
+            "p95_total_ms": pct(0.95),
+        }
+
+
+_lock = threading.Lock()
+_aggregates = {}
+
+
+def record(name: str, metrics: RequestMetrics, total: float) -> None:
+    with _lock:
+        agg = _aggregates.get(name)
+        if agg is None:
+            agg = _aggregates[name] = _Aggregate()
+        agg.count += 1
+        agg.queries += metrics.queries
+        agg.db += metrics.db
+        agg.template += metrics.template
+        agg.total += total
+        agg.max_total = max(agg.max_total, total)
+        agg.recent.append(total)
+
+
+def snapshot() -> dict:
+    """Aggregates by URL name, slowest average first (``p*`` over the last WINDOW requests)."""
+    with _lock:
+        rows = {name: agg.as_dict() for name, agg in _aggregates.items()}
+    return dict(sorted(rows.items(), key=lambda kv: -kv[1]["avg_total_ms"]))
+
+
+def reset() -> None:
+    with _lock:
+        _aggregates.clear()
@@ -0,0 +1,124 @@
+# mavtournaments/services/snapshots.py
+"""
+Static bracket snapshots for spectators: ``bracket.json`` and ``index.html``
+per tournament, atomically replaced, rewritten (debounced) after each result.
+"""
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+
+from mavtournaments.models import Tournament
+
+from .bracket_layout import CANVAS_MIN_TEAMS, layout_bracket, layout_geometry
+from .bracket_serializer import serialize_bracket_columnar
+
+logger = logging.getLogger(__name__)
+
+ENABLED = getattr(settings, "MAVBRACKET_SNAPSHOTS", False)
+ROOT = getattr(settings, "MAVBRACKET_SNAPSHOT_ROOT", os.path.join(settings.MEDIA_ROOT, "brackets"))
+URL = getattr(settings, "MAVBRACKET_SNAPSHOT_URL", settings.MEDIA_URL + "brackets/")
+DEBOUNCE = getattr(settings, "MAVBRACKET_SNAPSHOT_DEBOUNCE", 2.0)
+
+_lock = threading.Lock()
+_timers = {}        # tournament id -> pending threading.Timer
+_running = set()    # tournament ids being written right now
+_dirty = set()      # changed again while being written
+
+
+def snapshot_dir(tournament_id: int) -> str:
+    return os.path.join(ROOT, str(tournament_id))
+
+
+def snapshot_url(tournament_id: int) -> str:
+    return f"{URL}{tournament_id}/"
+
+
+def _write_atomic(directory: str, name: str, data: bytes) -> None:
+    for filename, payload in ((name, data), (name + ".gz", gzip.compress(data, mtime=0))):
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{filename}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.chmod(tmp, 0o644)   # mkstemp creates 0600; the web server must read it
+            os.replace(tmp, os.path.join(directory, filename))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def render_page(t: Tournament) -> str:
+    """The read-only bracket page, as served from the snapshot directory."""
+    use_canvas = t.bracket_size >= CANVAS_MIN_TEAMS
+    context = {"tournament": t, "t": t, "can_edit": False, "use_canvas": use_canvas, "snapshot": True}
+    if use_canvas:
+        context["geometry"] = layout_geometry(t)
+    else:
+        context["bracket_svg"] = render_to_string(
+            "mavtournaments/_bracket_svg.html", {"t": t, "can_edit": False, **layout_bracket(t)}
+        )
+    return render_to_string("mavtournaments/bracket.html", context)
+
+
+def publish(tournament_id: int) -> Optional[str]:
+    """
+    Write the snapshot of one tournament now; returns its directory, or None
+    (and removes any old snapshot) if the tournament no longer exists.
+    """
+    directory = snapshot_dir(tournament_id)
+    t = Tournament.objects.filter(pk=tournament_id).first()
+    if t is None:
+        shutil.rmtree(directory, ignore_errors=True)
+        return None
+    os.makedirs(directory, exist_ok=True)
+    # JSON first: the new page must never point at an older payload
+    body = json.dumps(serialize_bracket_columnar(t), separators=(",", ":"))
+    _write_atomic(directory, "bracket.json", body.encode())
+    _write_atomic(directory, "index.html", render_page(t).encode())
+    return directory
+
+
+def _fire(tournament_id: int) -> None:
+    with _lock:
+        _timers.pop(tournament_id, None)
+        _running.add(tournament_id)
+    try:
+        publish(tournament_id)
+    except Exception:
+        logger.exception("publishing the snapshot of tournament %s failed", tournament_id)
+    finally:
+        connection.close()   # this timer thread's connection
+        with _lock:
+            _running.discard(tournament_id)
+            again = tournament_id in _dirty
+            _dirty.discard(tournament_id)
+    if again:
+        _schedule_now(tournament_id)
+
+
+def _schedule_now(tournament_id: int) -> None:
+    with _lock:
+        if tournament_id in _timers:
+            return  # already pending; it will read the latest state
+        if tournament_id in _running:
+            _dirty.add(tournament_id)
+            return
+        timer = threading.Timer(DEBOUNCE, _fire, args=[tournament_id])
+        timer.daemon = True
+        _timers[tournament_id] = timer
+    timer.start()
+
+
+def schedule(tournament_id: int) -> None:
+    """Queue a debounced snapshot rewrite once the current transaction commits."""
+    if ENABLED:
+        transaction.on_commit(lambda: _schedule_now(tournament_id))
+
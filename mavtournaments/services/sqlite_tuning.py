@@ -0,0 +1,47 @@
+# mavtournaments/services/sqlite_tuning.py
+"""
+SQLite database profiles (see the README), merged into ``DATABASES`` by
+``apply_profile``. Must not import models: settings imports this module.
+"""
+import copy
+
+PROFILES = {
+    "default": {},
+    "production": {
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "timeout": 10,                     # seconds; sqlite3's busy handler
+            "transaction_mode": "IMMEDIATE",
+        },
+        "PRAGMAS": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 10000,             # ms; matches OPTIONS["timeout"]
+            "cache_size": -32000,              # KiB (negative = size, not pages)
+            "mmap_size": 256 * 1024 * 1024,
+            "temp_store": "MEMORY",
+        },
+    },
+}
+
+
+def apply_profile(db: dict, name: str) -> dict:
+    """Merge profile ``name`` into one ``DATABASES`` entry (in place) and return it."""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown database profile {name!r}; choose from {', '.join(PROFILES)}")
+    profile = copy.deepcopy(PROFILES[name])
+    options = profile.pop("OPTIONS", {})
+    db.update(profile)
+    db.setdefault("OPTIONS", {}).update(options)
+    return db
+
+
+def set_pragmas(sender, connection, **kwargs) -> None:
+    """``connection_created`` receiver: run the connection's PRAGMAS (SQLite only)."""
+    pragmas = connection.settings_dict.get("PRAGMAS")
+    if connection.vendor != "sqlite" or not pragmas:
+        return
+    with connection.cursor() as cur:
+        for key, value in pragmas.items():
+            cur.execute(f"PRAGMA {key} = {value}")
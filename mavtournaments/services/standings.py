@@ -0,0 +1,75 @@
+# mavtournaments/services/standings.py
+from typing import Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F
+
+from mavtournaments.models import Match, Standing, Team, Tournament
+
+# (round_index, team1_id, team2_id, winner_id, is_bye)
+MatchRow = Tuple[int, Optional[int], Optional[int], Optional[int], bool]
+
+
+def _tally(team_ids: Iterable[int], rows: Iterable[MatchRow]) -> dict:
+    table = {tid: {"wins": 0, "losses": 0, "byes": 0, "reached": 0} for tid in team_ids}
+    for ri, t1, t2, winner, is_bye in rows:
+        for tid in (t1, t2):
+            if tid in table:
+                table[tid]["reached"] = max(table[tid]["reached"], ri)
+        if not winner or winner not in table:
+            continue
+        row = table[winner]
+        row["reached"] = max(row["reached"], ri + 1)
+        if is_bye:
+            row["byes"] += 1
+            continue
+        row["wins"] += 1
+        loser = t2 if winner == t1 else t1
+        if loser in table:
+            table[loser]["losses"] += 1
+    return table
+
+
+@transaction.atomic
+def rebuild_standings(t: Tournament, rows: Optional[Iterable[MatchRow]] = None) -> int:
+    """
+    Recompute every Standing of ``t`` (and the teams' wins/losses) from match
+    data: ``rows`` when the caller already has it in memory (bracket
+    generation), otherwise one ``values_list`` read of the Match table.
+    """
+    if rows is None:
+        rows = Match.objects.filter(tournament=t).values_list(
+            "round__index", "team1_id", "team2_id", "winner_id", "is_bye"
+        )
+    team_ids = list(Team.objects.filter(tournament=t).values_list("pk", flat=True))
+    table = _tally(team_ids, rows)
+
+    Standing.objects.filter(tournament=t).delete()
+    Standing.objects.bulk_create([
+        Standing(tournament_id=t.pk, team_id=tid, **values) for tid, values in table.items()
+    ])
+    Team.objects.filter(tournament=t).update(wins=0, losses=0)
+    scored = [Team(pk=tid, wins=v["wins"], losses=v["losses"])
+              for tid, v in table.items() if v["wins"] or v["losses"]]
+    Team.objects.bulk_update(scored, ["wins", "losses"], batch_size=500)
+    return len(table)
+
+
+def record_result(round_index: int, winner_id: int, loser_id: Optional[int],
+                  counted: bool, byes_after: int) -> None:
+    """
+    Apply one decided match to the standings with atomic increments.
+
+    ``counted`` is False for byes; ``byes_after`` is how many byes the
+    winner was then auto-advanced through.
+    """
+    if counted:
+        Team.objects.filter(pk=winner_id).update(wins=F("wins") + 1)
+    Standing.objects.filter(team_id=winner_id).update(
+        wins=F("wins") + int(counted),
+        byes=F("byes") + int(not counted) + byes_after,
+        reached=round_index + 1 + byes_after,
+    )
+    if loser_id and counted:
+        Team.objects.filter(pk=loser_id).update(losses=F("losses") + 1)
+        Standing.objects.filter(team_id=loser_id).update(losses=F("losses") + 1)
@@ -0,0 +1,79 @@
+# mavtournaments/services/team_membership.py
+"""
+Join/leave with a maintained ``Team.member_count``.
+
+A join claims a slot with one conditional UPDATE
+(``member_count < max_players``) before inserting the membership, both in
+one transaction, so two users racing for the last slot cannot both get
+it and the count never drifts from the membership rows. Deleting a user
+cascades to their memberships, so ``release_user_slots`` (a pre_delete
+receiver on the user model) gives those slots back the same way.
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models.signals import pre_delete
+from django.db.models import F
+
+from mavtournaments.models import Team, TeamMembership
+
+from .tournament_cache import bump
+
+
+class MembershipError(Exception):
+    """Base class for join/leave failures; the message is user-facing."""
+
+
+class TeamFull(MembershipError):
+    pass
+
+
+class AlreadyOnTeam(MembershipError):
+    pass
+
+
+class NotOnTeam(MembershipError):
+    pass
+
+
+@transaction.atomic
+def join_team(team: Team, user, role: str = "player") -> TeamMembership:
+    claimed = (
+        Team.objects.filter(pk=team.pk, member_count__lt=F("max_players"))
+        .update(member_count=F("member_count") + 1)
+    )
+    if not claimed:
+        raise TeamFull(f'"{team.name}" is full.')
+    try:
+        membership = TeamMembership.objects.create(team=team, user=user, role=role)
+    except IntegrityError:
+        # unique (team, user): leaving the atomic block undoes the claimed slot
+        raise AlreadyOnTeam(f'You are already on "{team.name}".')
+    bump(team.tournament_id)
+    team.member_count += 1
+    return membership
+
+
+@transaction.atomic
+def leave_team(team: Team, user) -> None:
+    deleted, _ = TeamMembership.objects.filter(team=team, user=user).delete()
+    if not deleted:
+        raise NotOnTeam(f'You are not on "{team.name}".')
+    Team.objects.filter(pk=team.pk).update(member_count=F("member_count") - 1)
+    bump(team.tournament_id)
+    team.member_count -= 1
+
+
+def release_user_slots(sender, instance, **kwargs) -> None:
+    """Decrement member_count on every team the user being deleted belongs to."""
+    team_ids = list(TeamMembership.objects.filter(user_id=instance.pk).values_list("team_id", flat=True))
+    if not team_ids:
+        return
+    teams = Team.objects.filter(pk__in=team_ids)
+    teams.update(member_count=F("member_count") - 1)
+    for tournament_id in set(teams.values_list("tournament_id", flat=True)):
+        bump(tournament_id)
+
+
+def connect_signals() -> None:
+    pre_delete.connect(release_user_slots, sender=get_user_model(),
+                       dispatch_uid="team_membership:release_user_slots")
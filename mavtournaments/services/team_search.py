@@ -0,0 +1,141 @@
+# mavtournaments/services/team_search.py
+"""
+Team search on ``Team.search_slug``: indexed prefix matches first, then
+substring matches through SQLite FTS5 (trigram) or a ``contains`` scan.
+"""
+from django.db import OperationalError, connections, router
+from django.utils.text import slugify
+
+from mavtournaments.models import Team
+
+FTS_TABLE = "mavtournaments_team_fts"
+TEAM_TABLE = Team._meta.db_table
+PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+_FTS_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TEAM_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, search_slug) VALUES (new.id, new.search_slug);
+        END""",
+    f"{FTS_TABLE}_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TEAM_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_slug) VALUES ('delete', old.id, old.search_slug);
+        END""",
+    f"{FTS_TABLE}_au": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_slug ON {TEAM_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_slug) VALUES ('delete', old.id, old.search_slug);
+            INSERT INTO {FTS_TABLE}(rowid, search_slug) VALUES (new.id, new.search_slug);
+        END""",
+}
+
+_fts_ready = {}
+
+
+def ensure_team_fts(using=None, **kwargs) -> bool:
+    """
+    Create the FTS5 table and its sync triggers if missing (SQLite only) and
+    rebuild the index when anything had to be (re)created. Safe to call
+    repeatedly; returns whether FTS search is available.
+    """
+    conn = connections[using or "default"]
+    if conn.vendor != "sqlite":
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT name FROM sqlite_master WHERE name = %s OR name LIKE %s",
+                        [FTS_TABLE, f"{FTS_TABLE}_a_"])
+            existing = {row[0] for row in cur.fetchall()}
+            if existing >= {FTS_TABLE, *_FTS_TRIGGERS}:
+                _fts_ready[conn.alias] = True
+                return True
+            cur.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"search_slug, content='{TEAM_TABLE}', content_rowid='id', tokenize='trigram')"
+            )
+            for sql in _FTS_TRIGGERS.values():
+                cur.execute(sql)
+            cur.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    except OperationalError:
+        # SQLite built without FTS5 / trigram (< 3.34): prefix + icontains only
+        _fts_ready[conn.alias] = False
+        return False
+    _fts_ready[conn.alias] = True
+    return True
+
+
+def _connection():
+    # follows the routers, so spectator searches can run on a read replica
+    return connections[router.db_for_read(Team)]
+
+
+def _fts_available() -> bool:
+    connection = _connection()
+    if connection.alias not in _fts_ready:
+        if connection.vendor != "sqlite":
+            _fts_ready[connection.alias] = False
+        else:
+            with connection.cursor() as cur:
+                cur.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+                _fts_ready[connection.alias] = cur.fetchone() is not None
+    return _fts_ready[connection.alias]
+
+
+def _fts_ids(q: str, tournament_id, limit: int, offset: int):
+    sql = [
+        f"SELECT t.id FROM {FTS_TABLE} f JOIN {TEAM_TABLE} t ON t.id = f.rowid",
+        f"WHERE {FTS_TABLE} MATCH %s",
+    ]
+    params = ['"' + q.replace('"', '""') + '"']
+    if tournament_id is not None:
+        sql.append("AND t.tournament_id = %s")
+        params.append(tournament_id)
+    sql.append("ORDER BY (t.search_slug >= %s AND t.search_slug < %s) DESC, f.rank, t.search_slug, t.id")
+    sql.append("LIMIT %s OFFSET %s")
+    params += [q, q + "\uffff", limit, offset]
+    with _connection().cursor() as cur:
+        cur.execute(" ".join(sql), params)
+        return [row[0] for row in cur.fetchall()]
+
+
+def _orm_ids(q: str, tournament_id, limit: int, offset: int):
+    base = Team.objects.all()
+    if tournament_id is not None:
+        base = base.filter(tournament_id=tournament_id)
+    prefix = base.filter(search_slug__gte=q, search_slug__lt=q + "\uffff").order_by("search_slug", "id")
+    ids = list(prefix.values_list("pk", flat=True)[offset:offset + limit])
+    if len(ids) == limit:
+        return ids
+    # substring matches that are not prefixes rank after every prefix match;
+    # a short page means we now know how many prefix matches there are
+    n_prefix = offset + len(ids) if ids else prefix.count()
+    rest = (
+        base.filter(search_slug__contains=q).exclude(search_slug__startswith=q)
+        .order_by("search_slug", "id").values_list("pk", flat=True)
+    )
+    start = max(offset - n_prefix, 0)
+    return ids + list(rest[start:start + limit - len(ids)])
+
+
+def search_teams(query: str, tournament=None, page: int = 1, per_page: int = PER_PAGE) -> dict:
+    """
+    Ranked, paginated team search, optionally scoped to one tournament.
+    Queries are slugified the same way ``Team.save`` builds search_slug.
+    """
+    q = slugify(query or "")
+    page = max(int(page), 1)
+    per_page = min(max(int(per_page), 1), MAX_PER_PAGE)
+    result = {"query": q, "page": page, "per_page": per_page, "has_next": False, "teams": []}
+    if not q:
+        return result
+
+    tournament_id = getattr(tournament, "pk", tournament)
+    offset = (page - 1) * per_page
+    fetch = _fts_ids if len(q) >= 3 and _fts_available() else _orm_ids
+    ids = fetch(q, tournament_id, per_page + 1, offset)
+
+    result["has_next"] = len(ids) > per_page
+    ids = ids[:per_page]
+    by_id = Team.objects.select_related("tournament").in_bulk(ids)
+    result["teams"] = [by_id[i] for i in ids if i in by_id]
+    return result
@@ -0,0 +1,89 @@
+# mavtournaments/services/tournament_cache.py
+"""
+Per-tournament cache keyed by ``Tournament.cache_version``: bumping the
+version (signals, ``_bump_version``, ``bump``) invalidates every entry.
+"""
+import threading
+from collections import defaultdict
+from typing import Callable
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+
+from mavtournaments.models import Match, Round, Team, Tournament
+
+DEFAULT_TIMEOUT = 60 * 60
+
+_lock = threading.Lock()
+_counters = defaultdict(lambda: {"hits": 0, "misses": 0})
+_MISSING = object()
+
+
+def bump(tournament_id: int) -> None:
+    """Invalidate every cached entry of a tournament (one UPDATE)."""
+    Tournament.objects.filter(pk=tournament_id).update(cache_version=F("cache_version") + 1)
+
+
+def cache_key(t: Tournament, name: str, *parts) -> str:
+    suffix = "".join(f":{p}" for p in parts)
+    return f"mavtournaments:t{t.pk}:v{t.cache_version}:{name}{suffix}"
+
+
+def get_or_build(t: Tournament, name: str, build: Callable, *parts, timeout: int = DEFAULT_TIMEOUT):
+    """
+    Cached ``build()`` for the tournament's current version. ``name`` groups
+    the counters; ``parts`` further distinguish entries (e.g. per-viewer
+    variants).
+    """
+    key = cache_key(t, name, *parts)
+    value = cache.get(key, _MISSING)
+    hit = value is not _MISSING
+    with _lock:
+        _counters[name]["hits" if hit else "misses"] += 1
+    if not hit:
+        value = build()
+        cache.set(key, value, timeout)
+    return value
+
+
+def stats() -> dict:
+    with _lock:
+        names = {name: dict(c) for name, c in sorted(_counters.items())}
+    for c in names.values():
+        total = c["hits"] + c["misses"]
+        c["hit_rate"] = round(c["hits"] / total, 3) if total else None
+    hits = sum(c["hits"] for c in names.values())
+    misses = sum(c["misses"] for c in names.values())
+    backend = type(caches[DEFAULT_CACHE_ALIAS])
+    return {
+        "backend": f"{backend.__module__}.{backend.__name__}",
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+        "entries": names,
+    }
+
+
+def reset_stats() -> None:
+    with _lock:
+        _counters.clear()
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump(instance.tournament_id)
+
+
+def _on_team_delete(sender, instance, origin=None, **kwargs):
+    # a cascading tournament delete has nothing left worth invalidating
+    if isinstance(origin, Tournament) or getattr(origin, "model", None) is Tournament:
+        return
+    bump(instance.tournament_id)
+
+
+def connect_signals() -> None:
+    # bulk paths that bypass these signals call bump() or _bump_version
+    for model in (Team, Match, Round):
+        post_save.connect(_on_save, sender=model, dispatch_uid=f"tournament_cache:{model.__name__}")
+    post_delete.connect(_on_team_delete, sender=Team, dispatch_uid="tournament_cache:Team:delete")
@@ -1,3 +1,1003 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from itertools import accumulate
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import is_password_usable
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import Profile
+from mavtournaments import assets
+from mavtournaments.management.commands import bench_mavbracket
+from mavtournaments.models import Match, Round, Standing, Team, TeamMembership, Tournament
+from mavtournaments.routers import STICKY_COOKIE, ReplicaRouter, begin_request, end_request, read_from_replica
+from mavtournaments.services import csv_import, request_metrics, snapshots, tournament_cache
+from mavtournaments.services.bracket_builder import (
+    InvalidWinner, MatchConflict, compact_changes, generate_single_elim, set_winner,
+)
+from mavtournaments.services.bracket_serializer import serialize_bracket_columnar
+from mavtournaments.services.broadcast import InProcessBroadcaster, get_broadcaster
+from mavtournaments.services.sqlite_tuning import PROFILES, apply_profile, set_pragmas
+from mavtournaments.services.standings import rebuild_standings
+from mavtournaments.services.team_membership import join_team
+from mavtournaments.services.team_search import search_teams
+from mavtournaments.views import BRACKET_COLUMNAR_TYPE
+
+User = get_user_model()
+
+
+def make_teams(t, n, max_players=2):
+    return [Team.objects.create(tournament=t, name=f"team-{i:02d}", max_players=max_players) for i in range(1, n + 1)]
+
+
+def match_at(t, round_index, slot):
+    return Match.objects.select_related("tournament", "round", "team1", "team2", "next_win").get(
+        tournament=t, round__index=round_index, slot=slot,
+    )
+
+
+class GenerateTests(TestCase):
+    def test_full_bracket_is_wired(self):
+        t = Tournament.objects.create(name="Eight")
+        teams = make_teams(t, 8)
+        generate_single_elim(t)
+        t.refresh_from_db()
+        self.assertEqual(t.status, "ACTIVE")
+        self.assertEqual(Round.objects.filter(tournament=t).count(), 3)
+        self.assertEqual(Match.objects.filter(tournament=t).count(), 7)
+
+        first = match_at(t, 0, 0)
+        self.assertEqual((first.team1_id, first.team2_id), (teams[0].pk, teams[7].pk))   # POWER: 1 v 8
+        for m in Match.objects.filter(tournament=t).select_related("round", "next_win__round"):
+            if m.round.index == 2:
+                self.assertIsNone(m.next_win_id)
+            else:
+                self.assertEqual((m.next_win.round.index, m.next_win.slot), (m.round.index + 1, m.slot // 2))
+
+    def test_queries_grow_with_rounds_not_teams(self):
+        def queries(n):
+            t = Tournament.objects.create(name=f"T{n}", team_cap=n)
+            make_teams(t, n)
+            with CaptureQueriesContext(connection) as ctx:
+                generate_single_elim(t)
+            return len(ctx)
+
+        self.assertEqual(queries(64) - queries(8), 3)   # one INSERT per extra round
+
+    def test_regenerating_costs_the_same_as_the_first_build(self):
+        t = Tournament.objects.create(name="Regen", team_cap=64)
+        make_teams(t, 64)
+        counts = []
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as ctx:
+                generate_single_elim(t)
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(Match.objects.filter(tournament=t).count(), 63)
+        self.assertEqual(Round.objects.filter(tournament=t).count(), 6)
+
+
+class SeedViewTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin"))
+        self.t = Tournament.objects.create(name="Cup")
+
+    def url(self, name):
+        return reverse(f"tournaments:{name}", args=[self.t.pk])
+
+    def test_seeding_builds_the_bracket(self):
+        make_teams(self.t, 4)
+        self.assertRedirects(self.client.post(self.url("seed_random")), self.url("bracket"))
+        self.assertEqual(Match.objects.filter(tournament=self.t).count(), 3)
+
+    def test_seeding_needs_two_teams(self):
+        make_teams(self.t, 1)
+        self.assertRedirects(self.client.post(self.url("seed_power")), self.url("teams"))
+        self.assertFalse(Match.objects.filter(tournament=self.t).exists())
+
+    def test_seeding_is_post_only(self):
+        make_teams(self.t, 4)
+        self.assertEqual(self.client.get(self.url("seed_power")).status_code, 405)
+        self.assertFalse(Match.objects.filter(tournament=self.t).exists())
+
+
+class SetWinnerTests(TestCase):
+    def setUp(self):
+        self.t = Tournament.objects.create(name="Cup")
+        self.teams = make_teams(self.t, 3)
+        generate_single_elim(self.t)   # POWER: team-01 has a first-round bye
+        self.t.refresh_from_db()
+
+    def test_first_round_bye_advances_at_generation(self):
+        bye = match_at(self.t, 0, 0)
+        self.assertTrue(bye.is_bye)
+        self.assertEqual(bye.winner_id, self.teams[0].pk)
+        self.assertEqual(match_at(self.t, 1, 0).team1_id, self.teams[0].pk)
+
+    def test_byes_are_not_wins(self):
+        self.assertEqual(Team.objects.get(pk=self.teams[0].pk).wins, 0)
+        semi = match_at(self.t, 0, 1)
+        set_winner(semi, semi.team1)
+        self.assertEqual(Team.objects.get(pk=semi.team1_id).wins, 1)
+        self.assertEqual(Team.objects.get(pk=semi.team2_id).losses, 1)
+
+    def test_resend_is_a_no_op(self):
+        semi = match_at(self.t, 0, 1)
+        self.assertTrue(set_winner(semi, semi.team1))
+        self.assertFalse(set_winner(match_at(self.t, 0, 1), semi.team1))
+        self.assertEqual(Team.objects.get(pk=semi.team1_id).wins, 1)
+        self.assertEqual(Team.objects.get(pk=semi.team2_id).losses, 1)
+
+    def test_conflicting_winner_raises(self):
+        semi = match_at(self.t, 0, 1)
+        set_winner(semi, semi.team1)
+        with self.assertRaises(MatchConflict):
+            set_winner(match_at(self.t, 0, 1), semi.team2)
+        self.assertEqual(Match.objects.get(pk=semi.pk).winner_id, semi.team1_id)
+
+    def test_undecided_opponent_raises(self):
+        final = match_at(self.t, 1, 0)
+        self.assertIsNone(final.team2_id)
+        with self.assertRaises(InvalidWinner):
+            set_winner(final, final.team1)
+        self.t.refresh_from_db()
+        self.assertEqual(self.t.status, "ACTIVE")
+        self.assertIsNone(Match.objects.get(pk=final.pk).winner_id)
+
+    def test_winner_must_play_in_the_match(self):
+        semi = match_at(self.t, 0, 1)
+        with self.assertRaises(InvalidWinner):
+            set_winner(semi, self.teams[0])
+
+    def test_finished_only_once_the_final_is_decided(self):
+        semi = match_at(self.t, 0, 1)
+        set_winner(semi, semi.team2)
+        self.t.refresh_from_db()
+        self.assertEqual(self.t.status, "ACTIVE")
+
+        final = match_at(self.t, 1, 0)
+        self.assertEqual(final.team2_id, semi.team2_id)
+        set_winner(final, final.team2)
+        self.t.refresh_from_db()
+        self.assertEqual(self.t.status, "FINISHED")
+
+
+class MidTreeByeTests(TestCase):
+    """RANDOM seeding pairs teams in order, so an emptied subtree always sits on the right."""
+
+    def test_known_team_is_resolved_at_generation(self):
+        t = Tournament.objects.create(name="Five")
+        make_teams(t, 5)   # (a, b) (c, d) (e, -) (-, -)
+        generate_single_elim(t, seed_method="RANDOM")
+        lone = match_at(t, 0, 2)
+        mid = match_at(t, 1, 1)
+        self.assertTrue(mid.is_bye)
+        self.assertEqual(mid.team1_id, lone.winner_id)
+        self.assertEqual(mid.winner_id, lone.winner_id)
+        self.assertEqual(match_at(t, 2, 0).team2_id, lone.winner_id)
+
+    def test_pending_bye_is_advanced_through_by_set_winner(self):
+        t = Tournament.objects.create(name="Six")
+        make_teams(t, 6)   # (a, b) (c, d) (e, f) (-, -)
+        generate_single_elim(t, seed_method="RANDOM")
+        mid = match_at(t, 1, 1)
+        self.assertTrue(mid.is_bye)
+        self.assertIsNone(mid.winner_id)
+
+        feeder = match_at(t, 0, 2)
+        set_winner(feeder, feeder.team1)
+        self.assertEqual(Match.objects.get(pk=mid.pk).winner_id, feeder.team1_id)
+        self.assertEqual(match_at(t, 2, 0).team2_id, feeder.team1_id)
+        self.assertEqual(Team.objects.get(pk=feeder.team1_id).wins, 1)
+
+
+class BracketShapeTests(TestCase):
+    def test_generation_records_the_shape(self):
+        t = Tournament.objects.create(name="Five")
+        make_teams(t, 5)
+        generate_single_elim(t)
+        t.refresh_from_db()
+        self.assertEqual((t.bracket_size, t.round_count), (8, 3))
+        self.assertEqual(t.final_match_id, match_at(t, 2, 0).pk)
+
+    def test_results_and_regeneration_bump_the_version(self):
+        t = Tournament.objects.create(name="Four")
+        make_teams(t, 4)
+        generate_single_elim(t)
+        t.refresh_from_db()
+        start = t.result_version
+        m = match_at(t, 0, 0)
+        set_winner(m, m.team1)
+        t.refresh_from_db()
+        self.assertEqual(t.result_version, start + 1)
+        generate_single_elim(t)
+        t.refresh_from_db()
+        self.assertEqual(t.result_version, start + 2)
+
+    def test_too_few_teams_clears_the_shape(self):
+        t = Tournament.objects.create(name="Two")
+        make_teams(t, 2)
+        generate_single_elim(t)
+        Team.objects.filter(tournament=t).first().delete()
+        generate_single_elim(t)
+        t.refresh_from_db()
+        self.assertEqual((t.bracket_size, t.round_count, t.final_match_id), (0, 0, None))
+        self.assertFalse(Match.objects.filter(tournament=t).exists())
+
+
+class BracketDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_user("viewer"))
+        self.t = Tournament.objects.create(name="Five")
+        make_teams(self.t, 5)
+        generate_single_elim(self.t)
+        self.t.refresh_from_db()
+        self.url = reverse("tournaments:bracket_data", args=[self.t.pk])
+
+    def test_shape(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["tournament"]["version"], self.t.result_version)
+        self.assertEqual(data["tournament"]["final_match"], self.t.final_match_id)
+        self.assertEqual([len(r["matches"]) for r in data["rounds"]], [4, 2, 1])
+        self.assertEqual(data["rounds"][0]["matches"][3]["next"], data["rounds"][1]["matches"][1]["id"])
+        self.assertEqual(data["teams"][0], ["team-01", None])
+
+    def test_etag_revalidation(self):
+        resp = self.client.get(self.url)
+        etag = resp["ETag"]
+        self.assertIn("private", resp["Cache-Control"])
+        self.assertIn("no-cache", resp["Cache-Control"])
+        self.assertIn("Cookie", resp["Vary"])
+        self.assertEqual(self.client.get(self.url, headers={"if-none-match": etag}).status_code, 304)
+
+        m = match_at(self.t, 0, 3)
+        set_winner(m, m.team1)
+        resp = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_queries_do_not_depend_on_bracket_size(self):
+        big = Tournament.objects.create(name="Big")
+        make_teams(big, 32)
+        generate_single_elim(big)
+
+        def queries(t):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(reverse("tournaments:bracket_data", args=[t.pk]))
+            return len(ctx)
+
+        self.assertEqual(queries(self.t), queries(big))
+
+
+class BracketPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser("admin"))
+        self.t = Tournament.objects.create(name="Five")
+        make_teams(self.t, 5)
+        generate_single_elim(self.t)
+        self.url = reverse("tournaments:bracket", args=[self.t.pk])
+
+    def match_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertContains(self.client.get(self.url), "team-05")
+        return [q for q in ctx.captured_queries if "mavtournaments_match" in q["sql"]]
+
+    def test_svg_is_rendered_server_side(self):
+        self.assertContains(self.client.get(self.url), "<svg")
+
+    def test_repeat_views_reuse_the_cached_fragment(self):
+        self.assertTrue(self.match_queries())
+        self.assertFalse(self.match_queries())
+
+    def test_a_result_invalidates_the_fragment(self):
+        self.match_queries()
+        m = match_at(self.t, 0, 3)
+        set_winner(m, m.team1)
+        self.assertTrue(self.match_queries())
+
+
+class SetWinnerViewTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin"))
+        self.t = Tournament.objects.create(name="Cup")
+        make_teams(self.t, 3)
+        generate_single_elim(self.t)
+
+    def url(self, match, team_id):
+        return reverse("tournaments:set_winner", args=[self.t.pk, match.pk, team_id])
+
+    def test_post_records_the_result(self):
+        semi = match_at(self.t, 0, 1)
+        resp = self.client.post(self.url(semi, semi.team1_id))
+        self.assertRedirects(resp, reverse("tournaments:bracket", args=[self.t.pk]))
+        self.assertEqual(Match.objects.get(pk=semi.pk).winner_id, semi.team1_id)
+
+    def test_get_is_refused(self):
+        semi = match_at(self.t, 0, 1)
+        self.assertEqual(self.client.get(self.url(semi, semi.team1_id)).status_code, 405)
+        self.assertIsNone(Match.objects.get(pk=semi.pk).winner_id)
+
+    def test_invalid_pairings_are_bad_requests(self):
+        semi, final = match_at(self.t, 0, 1), match_at(self.t, 1, 0)
+        self.assertEqual(self.client.post(self.url(semi, match_at(self.t, 0, 0).team1_id)).status_code, 400)
+        self.assertEqual(self.client.post(self.url(final, final.team1_id)).status_code, 400)
+
+
+class BroadcastTests(SimpleTestCase):
+    async def test_a_client_that_falls_behind_is_told_to_resync(self):
+        broadcaster = InProcessBroadcaster()
+        broadcaster.queue_size = 2
+        sub = broadcaster.subscribe(1)
+        for version in (1, 2, 3):
+            broadcaster.publish(1, {"version": version})
+        await asyncio.sleep(0)   # let the queued _offer calls run
+        self.assertEqual(await sub.get(1), {"version": 2})
+        self.assertEqual(await sub.get(1), {"type": "resync"})
+        self.assertIsNone(await sub.get(0.01))
+        sub.close()
+        self.assertEqual(broadcaster.subscriber_count(1), 0)
+
+
+class BracketStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("viewer")
+        self.t = Tournament.objects.create(name="Cup")
+        make_teams(self.t, 4)
+        generate_single_elim(self.t)
+        self.t.refresh_from_db()
+        self.url = reverse("tournaments:bracket_stream", args=[self.t.pk])
+
+    async def test_hello_then_deltas(self):
+        await self.async_client.aforce_login(self.user)
+        resp = await self.async_client.get(self.url)
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        chunks = aiter(resp.streaming_content)
+        self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+        self.assertIn(f"id: {self.t.result_version}\n", (await anext(chunks)).decode())
+
+        get_broadcaster().publish(self.t.pk, {"version": self.t.result_version + 1, "events": []})
+        self.assertTrue((await anext(chunks)).startswith(b"event: delta\n"))
+        await chunks.aclose()
+
+    def test_wsgi_gets_no_stream(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 204)
+
+
+class BracketDataSinceTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("viewer"))
+        self.t = Tournament.objects.create(name="Eight")
+        make_teams(self.t, 8)
+        generate_single_elim(self.t)
+        self.t.refresh_from_db()
+        self.url = reverse("tournaments:bracket_data", args=[self.t.pk])
+
+    def since(self, version):
+        return self.client.get(self.url, {"since": version}).json()
+
+    def test_deltas_since_a_version(self):
+        start = self.t.result_version
+        self.assertEqual(self.since(start)["matches"], [])
+
+        m = match_at(self.t, 0, 0)
+        set_winner(m, m.team1)
+        data = self.since(start)
+        self.assertFalse(data["resync"])
+        self.assertEqual({row["id"] for row in data["matches"]}, {m.pk, m.next_win_id})
+        self.assertEqual(data["tournament"]["version"], start + 1)
+
+    def test_resync_when_the_log_cannot_answer(self):
+        start = self.t.result_version
+        for slot in range(3):
+            m = match_at(self.t, 0, slot)
+            set_winner(m, m.team1)
+        self.t.refresh_from_db()
+        compact_changes(self.t, keep=1)
+
+        self.assertTrue(self.since(start)["resync"])
+        self.assertFalse(self.since(self.t.result_version - 1)["resync"])
+        self.assertTrue(self.since(self.t.result_version + 5)["resync"])
+
+    def test_resync_after_regeneration(self):
+        start = self.t.result_version
+        generate_single_elim(self.t)
+        self.assertTrue(self.since(start)["resync"])
+
+    def test_bad_since(self):
+        self.assertEqual(self.client.get(self.url, {"since": "x"}).status_code, 400)
+
+
+class BulkImportTests(TestCase):
+    ROSTER = (
+        "Alpha, alice, bob\n"
+        "Beta; carol\n"
+        "Alpha, dave\n"          # listed twice
+        "Gamma, nobody\n"        # unknown user
+        ", erin\n"               # no team name
+        "Delta, alice, bob, carol\n"   # too many players
+    )
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin"))
+        for name in ("alice", "bob", "carol"):
+            User.objects.create_user(name)
+        self.t = Tournament.objects.create(name="Cup")
+
+    def preview(self, create_missing_users=False):
+        data = {"raw": self.ROSTER, "default_max_players": 2}
+        if create_missing_users:
+            data["create_missing_users"] = "on"
+        return self.client.post(reverse("tournaments:bulk_teams_preview", args=[self.t.pk]), data)
+
+    def confirm(self):
+        return self.client.post(reverse("tournaments:bulk_teams_confirm", args=[self.t.pk]))
+
+    def test_preview_writes_nothing_and_flags_bad_rows(self):
+        resp = self.preview()
+        summary = resp.context["summary"]
+        self.assertEqual((summary["total"], summary["valid"], summary["errors"]), (6, 2, 4))
+        errors = {row["line"]: row["error"] for row in resp.context["preview"] if row["error"]}
+        self.assertEqual(set(errors), {3, 4, 5, 6})
+        self.assertFalse(Team.objects.filter(tournament=self.t).exists())
+
+    def test_confirm_imports_the_valid_rows(self):
+        self.preview()
+        self.assertRedirects(self.confirm(), reverse("tournaments:teams", args=[self.t.pk]))
+        teams = {team.name: team for team in Team.objects.filter(tournament=self.t)}
+        self.assertEqual(set(teams), {"Alpha", "Beta"})
+
+        self.assertEqual(teams["Alpha"].member_count, 2)
+        self.assertEqual(TeamMembership.objects.filter(team=teams["Beta"]).count(), 1)
+        self.assertFalse(User.objects.filter(username="nobody").exists())
+
+    def test_confirm_can_create_missing_users(self):
+        self.preview(create_missing_users=True)
+        self.confirm()
+        self.assertTrue(Team.objects.filter(tournament=self.t, name="Gamma").exists())
+        nobody = User.objects.get(username="nobody")
+        self.assertFalse(is_password_usable(nobody.password))
+        self.assertTrue(Profile.objects.filter(user=nobody).exists())
+
+    def test_confirm_without_preview(self):
+        self.assertRedirects(self.confirm(), reverse("tournaments:bulk_teams", args=[self.t.pk]))
+        self.assertFalse(Team.objects.filter(tournament=self.t).exists())
+
+    def test_staged_upload_is_single_use(self):
+        self.preview()
+        self.confirm()
+        self.confirm()
+        self.assertEqual(Team.objects.filter(tournament=self.t).count(), 2)
+
+
+class TeamSearchTests(TestCase):
+    def setUp(self):
+        self.t = Tournament.objects.create(name="Cup")
+        for name in ("Red Dragons", "Dragonflies", "Blue Jays", "Snapdragon"):
+            Team.objects.create(tournament=self.t, name=name)
+
+    def names(self, query, **kwargs):
+        return [team.name for team in search_teams(query, self.t, **kwargs)["teams"]]
+
+    def test_prefix_matches_rank_first(self):
+        found = self.names("Dragon")
+        self.assertEqual(found[0], "Dragonflies")
+        self.assertEqual(set(found[1:]), {"Red Dragons", "Snapdragon"})
+
+    def test_index_follows_team_writes(self):
+        jays = Team.objects.get(tournament=self.t, name="Blue Jays")
+        jays.name = "Blue Dragons"
+        jays.save()
+        Team.objects.bulk_create([Team(tournament=self.t, name="Sea Dragons", search_slug="sea-dragons")])
+        Team.objects.filter(tournament=self.t, name="Red Dragons").delete()
+        self.assertEqual(set(self.names("agon")), {"Dragonflies", "Snapdragon", "Blue Dragons", "Sea Dragons"})
+
+    def test_pages_look_ahead_one_row(self):
+        first = search_teams("drag", self.t, per_page=2)
+        self.assertTrue(first["has_next"])
+        self.assertFalse(search_teams("drag", self.t, page=2, per_page=2)["has_next"])
+        self.assertEqual(search_teams("", self.t)["teams"], [])
+
+    def test_json_endpoint(self):
+        self.client.force_login(User.objects.create_user("viewer"))
+        resp = self.client.get(reverse("tournaments:team_search", args=[self.t.pk]), {"q": "blue"})
+        self.assertEqual([row["name"] for row in resp.json()["teams"]], ["Blue Jays"])
+        self.assertEqual(self.client.get(reverse("tournaments:team_search_all"), {"page": "x"}).status_code, 400)
+
+    def test_short_queries_match_substrings_too(self):
+        found = self.names("dr")
+        self.assertEqual(found[0], "Dragonflies")
+        self.assertEqual(set(found[1:]), {"Red Dragons", "Snapdragon"})
+
+
+class MembershipTests(TestCase):
+    def setUp(self):
+        self.t = Tournament.objects.create(name="Cup")
+        self.team = make_teams(self.t, 1, max_players=2)[0]
+        self.alice, self.bob, self.carol = (User.objects.create_user(n) for n in ("alice", "bob", "carol"))
+
+    def post(self, user, action):
+        self.client.force_login(user)
+        return self.client.post(reverse(f"tournaments:team_{action}", args=[self.t.pk, self.team.pk]))
+
+    def count(self):
+        return Team.objects.get(pk=self.team.pk).member_count
+
+    def test_join_and_leave_keep_member_count(self):
+        self.post(self.alice, "join")
+        self.post(self.alice, "join")   # already on the team
+        self.assertEqual(self.count(), 1)
+        self.post(self.bob, "join")
+        self.assertEqual(self.count(), 2)
+        self.post(self.alice, "leave")
+        self.post(self.alice, "leave")  # not on the team any more
+        self.assertEqual(self.count(), 1)
+        self.assertEqual(TeamMembership.objects.filter(team=self.team).count(), 1)
+
+    def test_capacity_is_enforced(self):
+        self.post(self.alice, "join")
+        self.post(self.bob, "join")
+        self.post(self.carol, "join")
+        self.assertEqual(self.count(), 2)
+        self.assertFalse(TeamMembership.objects.filter(team=self.team, user=self.carol).exists())
+
+    def test_saving_a_stale_team_keeps_the_counters(self):
+        stale = Team.objects.get(pk=self.team.pk)
+        self.post(self.alice, "join")
+        Team.objects.filter(pk=self.team.pk).update(wins=3, losses=1)
+        stale.name = "Renamed"
+        stale.save()
+        team = Team.objects.get(pk=self.team.pk)
+        self.assertEqual((team.name, team.search_slug), ("Renamed", "renamed"))
+        self.assertEqual((team.member_count, team.wins, team.losses), (1, 3, 1))
+
+    def test_deleting_a_user_frees_their_slot(self):
+        self.post(self.alice, "join")
+        self.post(self.bob, "join")
+        self.alice.delete()
+        self.assertEqual(self.count(), 1)
+        self.post(self.carol, "join")
+        self.assertEqual(self.count(), 2)
+
+
+class StandingsTests(TestCase):
+    def setUp(self):
+        self.t = Tournament.objects.create(name="Six")
+        make_teams(self.t, 6)   # (a, b) (c, d) (e, f) (-, -): one mid-tree bye
+        generate_single_elim(self.t, seed_method="RANDOM")
+        self.t.refresh_from_db()
+
+    def table(self):
+        standings = Standing.objects.filter(tournament=self.t)
+        counters = Team.objects.filter(tournament=self.t).values_list("pk", "wins", "losses")
+        return (
+            {s.team_id: (s.wins, s.losses, s.byes, s.reached) for s in standings},
+            {pk: (wins, losses) for pk, wins, losses in counters},
+        )
+
+    def play_round(self, index):
+        playable = Match.objects.filter(
+            tournament=self.t, round__index=index, winner__isnull=True, team1__isnull=False, team2__isnull=False,
+        ).select_related("tournament", "round", "team1", "team2", "next_win")
+        for m in playable:
+            set_winner(m, m.team1)
+
+    def test_incremental_results_match_a_rebuild(self):
+        for index in range(self.t.round_count):
+            self.play_round(index)
+            incremental = self.table()
+            rebuild_standings(self.t)
+            self.assertEqual(self.table(), incremental)
+
+        champion = Match.objects.get(pk=self.t.final_match_id).winner_id
+        self.assertEqual(Standing.objects.get(team_id=champion).reached, self.t.round_count)
+
+    def test_bye_counts_as_a_bye(self):
+        feeder = match_at(self.t, 0, 2)
+        set_winner(feeder, feeder.team1)
+        standing = Standing.objects.get(team_id=feeder.team1_id)
+        self.assertEqual((standing.wins, standing.byes, standing.reached), (1, 1, 2))
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    def test_production_profile_merges_into_the_entry(self):
+        db = {"ENGINE": "django.db.backends.sqlite3", "NAME": "x.sqlite3", "OPTIONS": {"init_command": "SELECT 1"}}
+        apply_profile(db, "production")
+        self.assertEqual(db["OPTIONS"], {"init_command": "SELECT 1", "timeout": 10, "transaction_mode": "IMMEDIATE"})
+        self.assertEqual(db["PRAGMAS"]["journal_mode"], "WAL")
+        db["PRAGMAS"]["journal_mode"] = "DELETE"
+        self.assertEqual(PROFILES["production"]["PRAGMAS"]["journal_mode"], "WAL")
+
+    def test_default_profile_changes_nothing(self):
+        db = {"ENGINE": "django.db.backends.sqlite3", "NAME": "x.sqlite3"}
+        self.assertEqual(apply_profile(dict(db), "default"), {**db, "OPTIONS": {}})
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            apply_profile({}, "fast")
+
+    def test_pragmas_run_on_new_sqlite_connections(self):
+        conn = mock.MagicMock(vendor="sqlite", settings_dict={"PRAGMAS": {"busy_timeout": 10000}})
+        set_pragmas(None, conn)
+        conn.cursor().__enter__().execute.assert_called_once_with("PRAGMA busy_timeout = 10000")
+
+
+class ReplicaRoutingTests(TestCase):
+    def route(self, model, sticky=False, write_first=False, replica_view=True):
+        router = ReplicaRouter()
+        seen = []
+
+        def view(request):
+            if write_first:
+                router.db_for_write(model)
+            seen.append(router.db_for_read(model))
+
+        token = begin_request(sticky)
+        try:
+            with mock.patch("mavtournaments.routers.replica_configured", return_value=True):
+                (read_from_replica(view) if replica_view else view)(None)
+        finally:
+            end_request(token)
+        return seen[0]
+
+    def test_spectator_reads_use_the_replica(self):
+        self.assertEqual(self.route(Tournament), "replica")
+        self.assertEqual(self.route(Tournament, replica_view=False), "default")
+        self.assertEqual(self.route(User), "default")   # auth stays on the primary
+
+    def test_own_writes_are_read_back_from_the_primary(self):
+        self.assertEqual(self.route(Tournament, write_first=True), "default")
+        self.assertEqual(self.route(Tournament, sticky=True), "default")
+
+    def test_no_replica_configured(self):
+        self.assertEqual(ReplicaRouter().db_for_read(Tournament), "default")
+
+    def test_writing_requests_set_the_sticky_cookie(self):
+        t = Tournament.objects.create(name="Cup")
+        team = make_teams(t, 1)[0]
+        self.client.force_login(User.objects.create_user("alice"))
+        resp = self.client.get(reverse("tournaments:teams", args=[t.pk]))
+        self.assertNotIn(STICKY_COOKIE, resp.cookies)
+        resp = self.client.post(reverse("tournaments:team_join", args=[t.pk, team.pk]))
+        self.assertIn(STICKY_COOKIE, resp.cookies)
+
+
+class TournamentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.t = Tournament.objects.create(name="Cup")
+        self.teams = make_teams(self.t, 4)
+
+    def version(self):
+        return Tournament.objects.get(pk=self.t.pk).cache_version
+
+    def test_team_writes_bump_the_version(self):
+        start = self.version()
+        team = self.teams[0]
+        team.name = "renamed"
+        team.save()
+        self.assertEqual(self.version(), start + 1)
+        team.delete()
+        self.assertEqual(self.version(), start + 2)
+
+    def test_results_and_joins_bump_the_version(self):
+        generate_single_elim(self.t)
+        start = self.version()
+        m = match_at(self.t, 0, 0)
+        set_winner(m, m.team1)
+        self.assertEqual(self.version(), start + 1)
+        join_team(self.teams[0], User.objects.create_user("alice"))
+        self.assertEqual(self.version(), start + 2)
+
+    def test_entries_are_rebuilt_after_a_bump(self):
+        build = mock.Mock(return_value=["payload"])
+        t = Tournament.objects.get(pk=self.t.pk)
+        self.assertEqual(tournament_cache.get_or_build(t, "test", build), ["payload"])
+        tournament_cache.get_or_build(t, "test", build)
+        self.assertEqual(build.call_count, 1)
+        tournament_cache.bump(t.pk)
+        t.refresh_from_db()
+        tournament_cache.get_or_build(t, "test", build)
+        self.assertEqual(build.call_count, 2)
+
+    def test_editing_the_tournament_bumps_the_version(self):
+        stale = Tournament.objects.get(pk=self.t.pk)
+        generate_single_elim(self.t)   # bumps both versions behind the stale copy's back
+        fresh = Tournament.objects.get(pk=self.t.pk)
+        stale.name = "Renamed"
+        stale.save()
+        saved = Tournament.objects.get(pk=self.t.pk)
+        self.assertEqual(saved.name, "Renamed")
+        self.assertEqual(saved.result_version, fresh.result_version)
+        self.assertEqual(saved.cache_version, fresh.cache_version + 1)
+        self.assertEqual(stale.cache_version, saved.cache_version)
+
+
+class IndexTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("viewer"))
+        self.ids = [
+            Tournament.objects.create(name=f"T{i}", status="FINISHED" if i % 2 else "DRAFT").pk for i in range(5)
+        ]
+
+    def page(self, **params):
+        with mock.patch("mavtournaments.views.INDEX_PAGE_SIZE", 2):
+            context = self.client.get(reverse("tournaments:index"), params).context
+        return [t.pk for t in context["tournaments"]], context["newer_cursor"], context["older_cursor"]
+
+    def test_cursors_walk_both_ways(self):
+        a0, a1, a2, a3, a4 = self.ids
+        self.assertEqual(self.page(), ([a4, a3], None, a3))
+        self.assertEqual(self.page(before=a3), ([a2, a1], a2, a1))
+        self.assertEqual(self.page(before=a1), ([a0], a0, None))
+        self.assertEqual(self.page(after=a2), ([a4, a3], None, a3))
+
+    def test_status_filter(self):
+        a0, a1, a2, a3, a4 = self.ids
+        self.assertEqual(self.page(status="FINISHED"), ([a3, a1], None, None))
+        self.assertEqual(self.page(status="bogus")[0], [a4, a3])
+
+    def test_cards_carry_counts(self):
+        t = Tournament.objects.get(pk=self.ids[-1])
+        make_teams(t, 5)   # POWER: three first-round byes, four real matches
+        generate_single_elim(t)
+        m = match_at(t, 0, 3)
+        set_winner(m, m.team1)
+        with mock.patch("mavtournaments.views.INDEX_PAGE_SIZE", 2):
+            resp = self.client.get(reverse("tournaments:index"))
+        card = resp.context["tournaments"][0]
+        self.assertEqual((card.team_count, card.played_count, card.playable_count), (5, 1, 4))
+        self.assertContains(resp, "1/4 matches played")
+
+
+class BenchBaselineTests(SimpleTestCase):
+    def compare(self, baseline, results):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"results": baseline}, f)
+        self.addCleanup(os.remove, f.name)
+        opts = {"baseline": f.name, "tolerance": 0.25, "min_delta_ms": 5.0}
+        return bench_mavbracket.Command()._compare(results, opts)
+
+    def test_regressions(self):
+        old = [{"teams": 8, "stage": "generate", "seconds": 0.010, "queries": 5}]
+        noise = [{"teams": 8, "stage": "generate", "seconds": 0.014, "queries": 5}]
+        worse = [{"teams": 8, "stage": "generate", "seconds": 0.050, "queries": 6}]
+        self.assertEqual(self.compare(old, noise), [])
+        self.assertEqual({r["metric"] for r in self.compare(old, worse)}, {"seconds", "queries"})
+
+    def test_renderer_changes_are_not_compared(self):
+        old = [{"teams": 128, "stage": "bracket_page", "seconds": 0.010, "queries": 5, "renderer": "svg"}]
+        new = [{"teams": 128, "stage": "bracket_page", "seconds": 0.100, "queries": 9, "renderer": "canvas"}]
+        self.assertEqual(self.compare(old, new), [])
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin"))
+        request_metrics.reset()
+
+    def test_off_by_default(self):
+        self.assertNotIn("Server-Timing", self.client.get(reverse("tournaments:index")))
+
+    @override_settings(MAVBRACKET_SERVER_TIMING=True)
+    def test_header_and_aggregates(self):
+        timing = self.client.get(reverse("tournaments:index"))["Server-Timing"]
+        for metric in ("db;dur=", "tpl;dur=", "app;dur=", "total;dur="):
+            self.assertIn(metric, timing)
+        report = self.client.get(reverse("tournaments:request_timings")).json()
+        self.assertTrue(report["enabled"])
+        self.assertEqual(report["views"]["tournaments:index"]["requests"], 1)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class SeedCommandTests(TestCase):
+    def seed(self, **opts):
+        call_command("seed_mavbracket", stdout=StringIO(), **opts)
+
+    def test_bulk_seed_with_results(self):
+        self.seed(users=10, teams=5, team_size=2, brackets=True, results=1, seed=1)
+        t = Tournament.objects.get(name="Demo Bracket")
+        self.assertEqual(t.status, "FINISHED")
+        self.assertEqual(Team.objects.filter(tournament=t, member_count=2).count(), 5)
+        self.assertEqual(TeamMembership.objects.filter(team__tournament=t).count(), 10)
+        self.assertEqual(Profile.objects.filter(user__username__startswith="player").count(), 10)
+
+        self.seed(users=10, teams=5, team_size=2)   # reruns reuse the users
+        self.assertEqual(User.objects.filter(username__startswith="player").count(), 10)
+        self.assertEqual(Tournament.objects.filter(name="Demo Bracket").count(), 1)
+
+    def test_needs_enough_users(self):
+        with self.assertRaises(CommandError):
+            self.seed(users=3, teams=2, team_size=2)
+
+
+class StaticAssetTests(SimpleTestCase):
+    BODY = b"console.log('bracket');\n" * 40
+    HASHED = "app.0123456789ab.js"
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        for name, data in ((self.HASHED, self.BODY), (self.HASHED + ".gz", gzip.compress(self.BODY)),
+                           ("app.js", self.BODY)):
+            with open(os.path.join(root, name), "wb") as f:
+                f.write(data)
+        with open(os.path.join(root, "staticfiles.json"), "w") as f:
+            json.dump({"version": "1.1", "paths": {"app.js": self.HASHED}}, f)
+        override = self.settings(STATIC_ROOT=root)
+        override.enable()
+        self.addCleanup(override.disable)
+        assets._immutable_names = None
+        self.addCleanup(setattr, assets, "_immutable_names", None)
+
+    def test_hashed_names_are_gzipped_and_immutable(self):
+        resp = self.client.get(f"/static/{self.HASHED}", headers={"accept-encoding": "gzip, br"})
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(resp["Cache-Control"], assets.IMMUTABLE_CACHE_CONTROL)
+        self.assertIn("Accept-Encoding", resp["Vary"])
+        self.assertEqual(gzip.decompress(b"".join(resp.streaming_content)), self.BODY)
+
+    def test_plain_names_revalidate(self):
+        resp = self.client.get("/static/app.js")
+        self.assertNotIn("Content-Encoding", resp)
+        self.assertEqual(resp["Cache-Control"], assets.REVALIDATE_CACHE_CONTROL)
+        self.assertEqual(b"".join(resp.streaming_content), self.BODY)
+
+    def test_only_files_under_static_root(self):
+        self.assertEqual(self.client.get("/static/missing.js").status_code, 404)
+        self.assertEqual(self.client.get("/static/../manage.py").status_code, 404)
+        self.assertEqual(self.client.post(f"/static/{self.HASHED}").status_code, 405)
+
+    def test_names_missing_from_the_manifest_stay_plain(self):
+        self.assertEqual(staticfiles_storage.url("app.js"), f"/static/{self.HASHED}")
+        self.assertEqual(staticfiles_storage.url("mavtournaments/new.js"), "/static/mavtournaments/new.js")
+
+
+class CanvasBracketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser("admin"))
+        self.t = Tournament.objects.create(name="Five")
+        make_teams(self.t, 5)
+        generate_single_elim(self.t)
+        self.url = reverse("tournaments:bracket", args=[self.t.pk])
+
+    def test_small_brackets_stay_svg(self):
+        resp = self.client.get(self.url)
+        self.assertContains(resp, "<svg")
+        self.assertNotContains(resp, 'id="bracket-canvas"')
+
+    def test_canvas_gets_the_layout_geometry(self):
+        resp = self.client.get(self.url, {"render": "canvas"})
+        self.assertContains(resp, 'id="bracket-canvas"')
+        self.assertContains(resp, 'id="bracket-geometry"')
+        self.assertNotContains(resp, "<svg")
+        geometry = resp.context["geometry"]
+        self.assertEqual((geometry["rounds"], geometry["bracket_size"]), (3, 8))
+
+    def test_only_svg_slots_carry_win_urls(self):
+        m = match_at(self.t, 0, 3)
+        svg = self.client.get(self.url)
+        win = reverse("tournaments:set_winner", args=[self.t.pk, m.pk, m.team1_id])
+        self.assertContains(svg, f'data-win-url="{win}"')
+        self.assertContains(svg, 'closest("svg a[data-win-url]")')
+
+        canvas = self.client.get(self.url, {"render": "canvas"})
+        template = reverse("tournaments:set_winner", args=[self.t.pk, 0, 0])
+        self.assertContains(canvas, f'data-win-url-template="{template}"')
+        self.assertNotContains(canvas, "data-win-url=")
+
+
+class ColumnarBracketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_user("viewer"))
+        self.t = Tournament.objects.create(name="Five")
+        make_teams(self.t, 5)   # POWER: byes in slots 0-2
+        generate_single_elim(self.t)
+        m = match_at(self.t, 0, 3)
+        set_winner(m, m.team2)
+        self.t.refresh_from_db()
+        self.url = reverse("tournaments:bracket_data", args=[self.t.pk])
+
+    def test_columnar_shape(self):
+        data = serialize_bracket_columnar(self.t)
+        first = data["rounds"][0]
+        self.assertEqual([len(col["team1"]) for col in data["rounds"]], [4, 2, 1])
+        self.assertEqual(list(accumulate(first["id"])), [match_at(self.t, 0, s).pk for s in range(4)])
+        self.assertEqual(data["teams"]["name"][first["team1"][0] - 1], "team-01")
+        self.assertEqual(first["team2"][:3], [0, 0, 0])
+        self.assertEqual(first["bye"], [1, 1, 1, 0])
+        self.assertEqual(first["winner"], [1, 1, 1, 2])
+
+    def test_representation_follows_accept(self):
+        plain = self.client.get(self.url)
+        columnar = self.client.get(self.url, headers={"accept": BRACKET_COLUMNAR_TYPE})
+        self.assertEqual(plain["Content-Type"], "application/json")
+        self.assertEqual(columnar["Content-Type"], BRACKET_COLUMNAR_TYPE)
+        self.assertEqual(columnar.json()["format"], 1)
+        self.assertNotEqual(plain["ETag"], columnar["ETag"])
+        for resp in (plain, columnar):
+            self.assertTrue({"Accept", "Accept-Encoding"} <= {v.strip() for v in resp["Vary"].split(",")})
+
+    def test_gzip_when_accepted(self):
+        plain = self.client.get(self.url)
+        zipped = self.client.get(self.url, headers={"accept-encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(zipped["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(zipped.content)), plain.json())
+        self.assertNotEqual(plain["ETag"], zipped["ETag"])
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        patcher = mock.patch.object(snapshots, "ROOT", root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.t = Tournament.objects.create(name="Five")
+        make_teams(self.t, 5)
+        generate_single_elim(self.t)
+        self.t.refresh_from_db()
+
+    def test_publish_writes_whole_files(self):
+        directory = snapshots.publish(self.t.pk)
+        self.assertEqual(sorted(os.listdir(directory)),
+                         ["bracket.json", "bracket.json.gz", "index.html", "index.html.gz"])
+        with open(os.path.join(directory, "bracket.json"), "rb") as f:
+            body = f.read()
+        self.assertEqual(json.loads(body)["tournament"]["version"], self.t.result_version)
+        with open(os.path.join(directory, "bracket.json.gz"), "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), body)
+
+    def test_deleted_tournament_loses_its_snapshot(self):
+        pk = self.t.pk
+        directory = snapshots.publish(pk)
+        self.t.delete()
+        self.assertIsNone(snapshots.publish(pk))
+        self.assertFalse(os.path.exists(directory))
+
+    def test_a_burst_of_changes_is_written_once(self):
+        with mock.patch.object(snapshots, "DEBOUNCE", 0.05), mock.patch.object(snapshots, "publish") as publish:
+            for _ in range(3):
+                snapshots._schedule_now(self.t.pk)
+            snapshots._timers[self.t.pk].join(5)
+        publish.assert_called_once_with(self.t.pk)
+
+    def test_results_schedule_a_rewrite_after_commit(self):
+        m = match_at(self.t, 0, 3)
+        with mock.patch.object(snapshots, "ENABLED", True), mock.patch.object(snapshots, "_schedule_now") as now:
+            with self.captureOnCommitCallbacks(execute=True):
+                set_winner(m, m.team1)
+        now.assert_called_once_with(self.t.pk)
+
+
+class StagedUploadTests(SimpleTestCase):
+    def test_stale_previews_are_pruned(self):
+        staging = tempfile.mkdtemp()
+        paths = {}
+        for name, age in (("old.csv", 7200), ("new.csv", 0), ("keep.txt", 7200)):
+            paths[name] = os.path.join(staging, name)
+            with open(paths[name], "w") as f:
+                f.write("Alpha, alice\n")
+            stamp = time.time() - age
+            os.utime(paths[name], (stamp, stamp))
+        with mock.patch.object(csv_import, "STAGING_DIR", staging):
+            self.assertEqual(csv_import.prune_staged(max_age=3600), 1)
+        self.assertEqual(sorted(os.listdir(staging)), ["keep.txt", "new.csv"])
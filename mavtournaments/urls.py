@@ -11,7 +11,10 @@ urlpatterns = [
     path("<int:pk>/delete/", views.delete_tournament, name="delete"),
 
     # Teams
+    path("teams/search/", views.team_search_all, name="team_search_all"),
     path("<int:pk>/teams/", views.teams, name="teams"),
+    path("<int:pk>/standings/", views.standings, name="standings"),
+    path("<int:pk>/teams/search/", views.team_search, name="team_search"),
     path("<int:pk>/teams/<int:team_id>/", views.team_detail, name="team_detail"),
     path("<int:pk>/teams/add/", views.add_team, name="add_team"),
     path("<int:pk>/teams/<int:team_id>/join/", views.team_join, name="team_join"),
@@ -20,7 +23,8 @@ urlpatterns = [
     # Bracket + views
     path("<int:pk>/", views.bracket, name="bracket"),
     path("<int:pk>/ui/", views.bracket, name="bracket_ui"),  # alias for old templates
-    path("<int:pk>/data/", views.bracket_data, name="bracket_data"),  # JSON for bracket_view.html
+    path("<int:pk>/data/", views.bracket_data, name="bracket_data"),  # JSON for bracket_canvas.js
+    path("<int:pk>/stream/", views.bracket_stream, name="bracket_stream"),  # SSE deltas (ASGI)
 
     # Seeding (explicit names — recommended)
     path("<int:pk>/seed/random/", views.seed_random, name="seed_random"),
@@ -38,4 +42,8 @@ urlpatterns = [
     path("<int:pk>/bulk-teams/preview/", views.bulk_teams_preview, name="bulk_teams_preview"),
     path("<int:pk>/bulk-teams/confirm/", views.bulk_teams_confirm, name="bulk_teams_confirm"),
     path("<int:pk>/csv-template/", views.csv_template, name="csv_template"),
+
+    # Ops
+    path("cache-stats/", views.cache_stats, name="cache_stats"),
+    path("debug/timings/", views.request_timings, name="request_timings"),
 ]
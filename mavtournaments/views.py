@@ -1,11 +1,33 @@
 # mavtournaments/views.py
+import gzip
+import json
+import os
+
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required, permission_required
-from django.http import HttpResponse, JsonResponse
-from django.shortcuts import get_object_or_404, redirect, render
-
-from .models import Tournament, Team  # include Round/Match if you have them
-from .forms import TournamentForm, TeamForm    # keep your custom forms if any
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.urls import reverse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.safestring import mark_safe
+from django.views import static
+from django.views.decorators.http import condition, require_POST
+
+from .assets import accepts_gzip
+from .models import Tournament, Team, Match, Standing
+from .routers import read_from_replica
+from .forms import BulkTeamsForm, TournamentForm, TeamForm
+from .services import bracket_builder, csv_import, request_metrics, snapshots, team_membership, tournament_cache
+from .services.bracket_layout import CANVAS_MIN_TEAMS, layout_bracket, layout_geometry
+from .services.broadcast import get_broadcaster
+from .services.team_search import search_teams
+from .services.bracket_serializer import serialize_bracket, serialize_bracket_columnar, serialize_changes
 
 
 def _ctx_tournament(t, **extra):
@@ -18,10 +40,63 @@ def _ctx_tournament(t, **extra):
 # --------------------------
 # Tournaments
 # --------------------------
+INDEX_PAGE_SIZE = 24
+TOURNAMENT_STATUSES = dict(Tournament._meta.get_field("status").choices)
+
+def _count_of(model, **filters):
+    """Correlated COUNT(*) per tournament, for annotate() (0 instead of NULL)."""
+    counts = (
+        model.objects.filter(tournament=OuterRef("pk"), **filters)
+        .order_by().values("tournament").annotate(n=Count("pk")).values("n")
+    )
+    return Coalesce(Subquery(counts), 0)
+
 @login_required
+@read_from_replica
 def index(request):
-    qs = Tournament.objects.order_by("-id")
-    return render(request, "mavtournaments/index.html", {"tournaments": qs})
+    """
+    Tournaments, newest first, keyset-paginated: ``?before=<id>`` pages to
+    older ones and ``?after=<id>`` back to newer ones, each an index seek on
+    (status, -id), so a page costs the same however long the history gets.
+    ``?status=`` filters. Team and played-match counts come from correlated
+    subqueries evaluated only for the rows on the page.
+    """
+    status = request.GET.get("status", "")
+    if status not in TOURNAMENT_STATUSES:
+        status = ""
+    before, after = request.GET.get("before", ""), request.GET.get("after", "")
+
+    qs = Tournament.objects.all()
+    if status:
+        qs = qs.filter(status=status)
+    base = qs
+    qs = qs.annotate(
+        team_count=_count_of(Team),
+        played_count=_count_of(Match, winner__isnull=False, is_bye=False),
+        playable_count=_count_of(Match, is_bye=False),
+    )
+
+    if after.isdigit():
+        # walk up from the cursor, then flip back to newest-first
+        page = list(qs.filter(pk__gt=int(after)).order_by("id")[:INDEX_PAGE_SIZE + 1])
+        has_newer = len(page) > INDEX_PAGE_SIZE
+        page = page[:INDEX_PAGE_SIZE][::-1]
+        has_older = bool(page) and base.filter(pk__lt=page[-1].pk).exists()
+    else:
+        if before.isdigit():
+            qs = qs.filter(pk__lt=int(before))
+        page = list(qs.order_by("-id")[:INDEX_PAGE_SIZE + 1])
+        has_older = len(page) > INDEX_PAGE_SIZE
+        page = page[:INDEX_PAGE_SIZE]
+        has_newer = before.isdigit() and bool(page) and base.filter(pk__gt=page[0].pk).exists()
+
+    return render(request, "mavtournaments/index.html", {
+        "tournaments": page,
+        "status": status,
+        "statuses": TOURNAMENT_STATUSES,
+        "newer_cursor": page[0].pk if has_newer else None,
+        "older_cursor": page[-1].pk if has_older else None,
+    })
 
 @login_required
 @permission_required("mavtournaments.add_tournament", raise_exception=True)
@@ -51,51 +126,256 @@ def delete_tournament(request, pk):
 # --------------------------
 # Bracket
 # --------------------------
+BRACKET_SVG_TIMEOUT = 60 * 60 * 24
+
+def _bracket_svg(t, can_edit):
+    """
+    Rendered SVG fragment for ``t``, cached per tournament version: any
+    change makes the old entry unreachable, and repeat views of an
+    unchanged bracket never load a single match.
+    """
+    svg = tournament_cache.get_or_build(
+        t, "bracket-svg",
+        lambda: render_to_string(
+            "mavtournaments/_bracket_svg.html", {"t": t, "can_edit": can_edit, **layout_bracket(t)}
+        ),
+        int(can_edit), timeout=BRACKET_SVG_TIMEOUT,
+    )
+    return mark_safe(svg)
+
 @login_required
+@read_from_replica
 def bracket(request, pk):
+    """
+    Bracket page. Small brackets are server-rendered SVG; large ones (or
+    ``?render=canvas``) get a canvas that bracket_canvas.js fills from the
+    bracket JSON, drawing only what is in view.
+    """
     t = get_object_or_404(Tournament, pk=pk)
-    return render(request, "mavtournaments/bracket.html", _ctx_tournament(t))
+    can_edit = request.user.has_perm("mavtournaments.advance_match")
+    mode = request.GET.get("render")
+    use_canvas = mode == "canvas" or (mode != "svg" and t.bracket_size >= CANVAS_MIN_TEAMS)
+    if use_canvas:
+        extra = {"geometry": layout_geometry(t)}
+    else:
+        extra = {"bracket_svg": _bracket_svg(t, can_edit)}
+    if snapshots.ENABLED and os.path.exists(os.path.join(snapshots.snapshot_dir(t.pk), "index.html")):
+        extra["snapshot_url"] = snapshots.snapshot_url(t.pk)
+    return render(request, "mavtournaments/bracket.html", _ctx_tournament(
+        t, can_edit=can_edit, use_canvas=use_canvas, **extra,
+    ))
+
+# bracket_data representations, picked by the Accept header
+BRACKET_JSON_TYPE = "application/json"
+BRACKET_COLUMNAR_TYPE = "application/vnd.mavbracket.columnar+json"
+BRACKET_REPRESENTATIONS = {
+    BRACKET_JSON_TYPE: ("bracket-json", serialize_bracket),
+    BRACKET_COLUMNAR_TYPE: ("bracket-columnar", serialize_bracket_columnar),
+}
+
+def _bracket_type(request):
+    # plain JSON unless the client asks for the columnar form by name
+    return request.get_preferred_type([BRACKET_JSON_TYPE, BRACKET_COLUMNAR_TYPE]) or BRACKET_JSON_TYPE
+
+def _bracket_etag(request, pk):
+    """
+    ETag = tournament id + result/cache versions (+ representation and
+    encoding); one indexed primary-key read.
+    """
+    versions = Tournament.objects.filter(pk=pk).values_list("result_version", "cache_version").first()
+    if versions is None:
+        return None
+    tag = f"{pk}-{versions[0]}-{versions[1]}"
+    if "since" not in request.GET:
+        tag += "-c" if _bracket_type(request) == BRACKET_COLUMNAR_TYPE else ""
+        tag += "-gz" if accepts_gzip(request) else ""
+    return tag
 
 @login_required
+@read_from_replica
+@condition(etag_func=_bracket_etag)
 def bracket_data(request, pk):
-    """Very simple JSON shape so bracket_view.html can render without errors."""
+    """
+    Full bracket (see services.bracket_serializer) in a fixed number of
+    queries: the JSON shape, or the columnar one for clients that send
+    ``Accept: application/vnd.mavbracket.columnar+json``. Both are cached
+    per tournament version, gzipped once when the client accepts it.
+    Pollers that send If-None-Match get a 304 before anything is
+    serialized; ``?since=<version>`` returns only the matches changed after
+    that version (or ``"resync": true`` when the change log can't say).
+    """
     t = get_object_or_404(Tournament, pk=pk)
-    data = {
-        "tournament": {"id": t.pk, "name": t.name},
-        "rounds": [],   # fill with your real data structure later
-        "teams": [],    # idem
-    }
-    return JsonResponse(data)
+    since = request.GET.get("since")
+    if since is None:
+        content_type = _bracket_type(request)
+        name, serialize = BRACKET_REPRESENTATIONS[content_type]
+        body = tournament_cache.get_or_build(
+            t, name, lambda: json.dumps(serialize(t), separators=(",", ":"))
+        )
+        gzipped = accepts_gzip(request)
+        if gzipped:
+            body = tournament_cache.get_or_build(t, name + "-gz", lambda: gzip.compress(body.encode(), mtime=0))
+        resp = HttpResponse(body, content_type=content_type)
+        if gzipped:
+            resp["Content-Encoding"] = "gzip"
+        patch_vary_headers(resp, ["Accept", "Accept-Encoding"])
+    elif since.isdigit():
+        resp = JsonResponse(serialize_changes(t, int(since)))
+    else:
+        return HttpResponseBadRequest("since must be a non-negative integer version")
+    # let browsers keep the body but always revalidate against the ETag
+    patch_cache_control(resp, private=True, no_cache=True)
+    return resp
+
+def bracket_snapshot(request, path):
+    """
+    Published snapshots (services.snapshots) for local runs; in production
+    the web server maps MAVBRACKET_SNAPSHOT_URL onto the snapshot directory.
+    """
+    if not path or path.endswith("/"):
+        path += "index.html"
+    resp = static.serve(request, path, document_root=snapshots.ROOT)
+    # snapshots change in place: revalidate every time (cheap 304s)
+    patch_cache_control(resp, no_cache=True)
+    return resp
+
+STREAM_HEARTBEAT = 15  # seconds between keep-alive comments on idle streams
+
+def _sse(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+@login_required
+async def bracket_stream(request, pk):
+    """
+    Server-Sent Events feed of bracket deltas (see bracket_builder.set_winner).
+
+    Needs an ASGI server (BaseTemplate.asgi): each client is a coroutine
+    parked on its subscription queue, so idle spectators cost no threads.
+    Under WSGI the endless stream would pin a worker per open page, so it
+    answers 204 instead, which tells EventSource not to reconnect.
+    The first ``hello`` event carries the current result_version so a client
+    can tell whether it missed anything since its page was rendered.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    t = await aget_object_or_404(Tournament, pk=pk)
+
+    async def stream():
+        sub = get_broadcaster().subscribe(t.pk)
+        try:
+            yield "retry: 3000\n\n"
+            version = await Tournament.objects.filter(pk=t.pk).values_list("result_version", flat=True).afirst()
+            yield _sse("hello", {"version": version}, version)
+            while True:
+                message = await sub.get(STREAM_HEARTBEAT)
+                if message is None:
+                    yield ": ping\n\n"
+                elif message.get("type") == "resync":
+                    yield _sse("resync", message)
+                    return
+                else:
+                    yield _sse("delta", message, message["version"])
+        finally:
+            sub.close()
+
+    resp = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    resp["Cache-Control"] = "no-cache"
+    resp["X-Accel-Buffering"] = "no"  # keep reverse proxies from buffering the stream
+    return resp
 
 
 # --------------------------
 # Teams
 # --------------------------
 @login_required
+@read_from_replica
 def teams(request, pk):
     t = get_object_or_404(Tournament, pk=pk)
-    teams_qs = Team.objects.filter(tournament=t).order_by("name")
-    return render(request, "mavtournaments/teams.html", _ctx_tournament(t, teams=teams_qs))
+    teams_list = tournament_cache.get_or_build(
+        t, "teams", lambda: list(Team.objects.filter(tournament=t).order_by("name"))
+    )
+    return render(request, "mavtournaments/teams.html", _ctx_tournament(t, teams=teams_list))
+
+@login_required
+@read_from_replica
+def standings(request, pk):
+    """Leaderboard: one indexed read of the materialized Standing rows (cached)."""
+    t = get_object_or_404(Tournament, pk=pk)
+    rows = tournament_cache.get_or_build(
+        t, "standings", lambda: list(Standing.objects.filter(tournament=t).select_related("team"))
+    )
+    return render(request, "mavtournaments/standings.html", _ctx_tournament(t, standings=rows))
+
+def _team_search_response(request, t=None):
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        return HttpResponseBadRequest("page must be an integer")
+    found = search_teams(request.GET.get("q", ""), tournament=t, page=page)
+    found["teams"] = [
+        {"id": team.pk, "name": team.name, "tournament": {"id": team.tournament_id, "name": team.tournament.name},
+         "url": reverse("tournaments:team_detail", args=[team.tournament_id, team.pk])}
+        for team in found["teams"]
+    ]
+    return JsonResponse(found)
+
+@login_required
+@read_from_replica
+def team_search(request, pk):
+    """JSON: ?q=<text>&page=<n> — teams of one tournament, prefix matches first."""
+    t = get_object_or_404(Tournament, pk=pk)
+    return _team_search_response(request, t)
+
+@login_required
+@read_from_replica
+def team_search_all(request):
+    """JSON: same as team_search, across every tournament."""
+    return _team_search_response(request)
 
 @login_required
+@read_from_replica
 def team_detail(request, pk, team_id):
     t = get_object_or_404(Tournament, pk=pk)
     team = get_object_or_404(Team, pk=team_id, tournament=t)
-    return render(request, "mavtournaments/team_detail.html", _ctx_tournament(t, team=team))
+    members = list(team.players.select_related("profile").order_by("username"))
+    matches = (
+        Match.objects.filter(Q(team1=team) | Q(team2=team))
+        .select_related("round", "team1", "team2", "winner")
+    )
+    return render(request, "mavtournaments/team_detail.html", _ctx_tournament(
+        t, team=team, members=members, matches=matches,
+        is_member=any(u.pk == request.user.pk for u in members),
+    ))
 
 @login_required
 def team_join(request, pk, team_id):
-    # TODO: add actual membership logic
-    t = get_object_or_404(Tournament, pk=pk)
-    messages.success(request, "Joined team (placeholder).")
-    return redirect("tournaments:team_detail", pk=t.pk, team_id=team_id)
+    team = get_object_or_404(Team, pk=team_id, tournament_id=pk)
+    if request.method != "POST":
+        return redirect("tournaments:team_detail", pk=pk, team_id=team.pk)
+    try:
+        team_membership.join_team(team, request.user)
+    except team_membership.MembershipError as exc:
+        messages.error(request, str(exc))
+    else:
+        messages.success(request, f'Joined "{team.name}".')
+    return redirect("tournaments:team_detail", pk=pk, team_id=team.pk)
 
 @login_required
 def team_leave(request, pk, team_id):
-    # TODO: add actual membership logic
-    t = get_object_or_404(Tournament, pk=pk)
-    messages.info(request, "Left team (placeholder).")
-    return redirect("tournaments:team_detail", pk=t.pk, team_id=team_id)
+    team = get_object_or_404(Team, pk=team_id, tournament_id=pk)
+    if request.method != "POST":
+        return redirect("tournaments:team_detail", pk=pk, team_id=team.pk)
+    try:
+        team_membership.leave_team(team, request.user)
+    except team_membership.MembershipError as exc:
+        messages.error(request, str(exc))
+    else:
+        messages.info(request, f'Left "{team.name}".')
+    return redirect("tournaments:team_detail", pk=pk, team_id=team.pk)
 
 @login_required
 @permission_required(
@@ -131,18 +411,29 @@ def add_team(request, pk):
 # --------------------------
 @login_required
 @permission_required("mavtournaments.manage_seeding", raise_exception=True)
+@require_POST
 def seed_random(request, pk):
     t = get_object_or_404(Tournament, pk=pk)
-    # TODO: call your random seeding service
-    messages.info(request, "Random seeding executed (placeholder).")
-    return redirect("tournaments:bracket", pk=t.pk)
+    return _generate(request, t, "RANDOM")
 
 @login_required
 @permission_required("mavtournaments.manage_seeding", raise_exception=True)
+@require_POST
 def seed_power(request, pk):
     t = get_object_or_404(Tournament, pk=pk)
-    # TODO: call your power seeding service
-    messages.info(request, "Power seeding executed (placeholder).")
+    return _generate(request, t, "POWER")
+
+def _generate(request, t, seed_method):
+    """Shared body of the seeding views: (re)build the bracket and report back."""
+    team_count = t.teams.count()
+    if team_count < 2:
+        messages.error(request, "Add at least two teams before generating a bracket.")
+        return redirect("tournaments:teams", pk=t.pk)
+    if team_count > t.team_cap:
+        messages.error(request, f"{team_count} teams exceed the cap of {t.team_cap}.")
+        return redirect("tournaments:teams", pk=t.pk)
+    bracket_builder.generate_single_elim(t, seed_method=seed_method)
+    messages.success(request, f"{seed_method.title()} seeding generated a bracket for {team_count} teams.")
     return redirect("tournaments:bracket", pk=t.pk)
 
 
@@ -158,10 +449,27 @@ def advance_match(request, pk, match_id):
 
 @login_required
 @permission_required("mavtournaments.advance_match", raise_exception=True)
+@require_POST
 def set_winner(request, pk, match_id, team_id):
-    """Alias used by existing templates; routes to advance logic."""
-    # TODO: implement: set winner=team_id for match_id and propagate
-    messages.success(request, f"Set winner for match {match_id} (team {team_id}) (placeholder).")
+    """Record team_id as the winner of match_id and advance it (POSTed by the bracket page)."""
+    match = get_object_or_404(
+        Match.objects.select_related("tournament", "round", "team1", "team2", "next_win"),
+        pk=match_id, tournament_id=pk,
+    )
+    if match.team1_id is None or match.team2_id is None:
+        return HttpResponseBadRequest(f"{match.label()} is still waiting for an opponent.")
+    winner = next((team for team in (match.team1, match.team2) if team.pk == team_id), None)
+    if winner is None:
+        return HttpResponseBadRequest("That team is not playing in this match.")
+    try:
+        recorded = bracket_builder.set_winner(match, winner)
+    except bracket_builder.MatchConflict:
+        messages.error(request, f"{match.label()} was already decided by someone else; the bracket has been refreshed.")
+    else:
+        if recorded:
+            messages.success(request, f"{winner.name} wins {match.label()}.")
+        else:
+            messages.info(request, f"{winner.name} was already recorded as the winner of {match.label()}.")
     return redirect("tournaments:bracket", pk=pk)
 
 @login_required
@@ -181,24 +489,76 @@ def team_builder(request, pk):
     t = get_object_or_404(Tournament, pk=pk)
     return render(request, "mavtournaments/team_builder.html", _ctx_tournament(t))
 
+BULK_IMPORT_SESSION_KEY = "mavbracket_bulk_import"
+
 @login_required
 @permission_required("mavtournaments.manage_teams", raise_exception=True)
 def bulk_teams(request, pk):
     t = get_object_or_404(Tournament, pk=pk)
-    return render(request, "mavtournaments/bulk_teams.html", _ctx_tournament(t))
+    form = BulkTeamsForm(initial={"default_max_players": t.default_team_size})
+    return render(request, "mavtournaments/bulk_teams.html", _ctx_tournament(t, form=form))
 
 @login_required
 @permission_required("mavtournaments.manage_teams", raise_exception=True)
 def bulk_teams_preview(request, pk):
+    """Stage the upload on disk and dry-run it; nothing is written to the DB."""
     t = get_object_or_404(Tournament, pk=pk)
-    messages.error(request, "Nothing to preview yet (placeholder).")
-    return redirect("tournaments:bulk_teams", pk=t.pk)
+    if request.method != "POST":
+        return redirect("tournaments:bulk_teams", pk=t.pk)
+
+    form = BulkTeamsForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return render(request, "mavtournaments/bulk_teams.html", _ctx_tournament(t, form=form))
+
+    opts = form.cleaned_data
+    previous = request.session.get(BULK_IMPORT_SESSION_KEY)
+    if previous:
+        csv_import.discard_staged(previous["token"])
+    token = csv_import.stage_upload(opts["file"], opts["raw"] or "")
+    request.session[BULK_IMPORT_SESSION_KEY] = {
+        "tournament": t.pk,
+        "token": token,
+        "max_players": opts["default_max_players"],
+        "create_missing_users": opts["create_missing_users"],
+    }
+
+    with open(csv_import.staged_path(token), "rb") as f:
+        summary = csv_import.preview_import(
+            t, csv_import.iter_team_rows(f), opts["default_max_players"], opts["create_missing_users"]
+        )
+    return render(request, "mavtournaments/bulk_teams_preview.html", _ctx_tournament(
+        t, preview=summary["rows"], summary=summary,
+        default_max_players=opts["default_max_players"],
+        create_missing_users=opts["create_missing_users"],
+    ))
 
 @login_required
 @permission_required("mavtournaments.manage_teams", raise_exception=True)
 def bulk_teams_confirm(request, pk):
     t = get_object_or_404(Tournament, pk=pk)
-    messages.success(request, "No teams created (placeholder).")
+    staged = request.session.get(BULK_IMPORT_SESSION_KEY)
+    if request.method != "POST" or not staged or staged["tournament"] != t.pk:
+        messages.error(request, "Nothing to import; upload the teams again.")
+        return redirect("tournaments:bulk_teams", pk=t.pk)
+
+    try:
+        with open(csv_import.staged_path(staged["token"]), "rb") as f:
+            result = csv_import.import_teams(
+                t, csv_import.iter_team_rows(f), staged["max_players"], staged["create_missing_users"]
+            )
+    except (OSError, ValueError):
+        messages.error(request, "The staged import has expired; upload the teams again.")
+        return redirect("tournaments:bulk_teams", pk=t.pk)
+    finally:
+        csv_import.discard_staged(staged["token"])
+        request.session.pop(BULK_IMPORT_SESSION_KEY, None)
+
+    msg = f'Imported {result["teams"]} teams'
+    if result["users"]:
+        msg += f', created {result["users"]} users'
+    if result["skipped"]:
+        msg += f', skipped {result["skipped"]} invalid rows'
+    messages.success(request, msg + ".")
     return redirect("tournaments:teams", pk=t.pk)
 
 @login_required
@@ -207,3 +567,21 @@ def csv_template(request, pk):
     resp = HttpResponse(sample, content_type="text/csv; charset=utf-8")
     resp["Content-Disposition"] = f'attachment; filename=\"mavbracket_csv_template_{pk}.csv\"'
     return resp
+
+
+# --------------------------
+# Ops
+# --------------------------
+@staff_member_required
+def cache_stats(request):
+    """JSON hit/miss counters of the per-tournament cache (this process only)."""
+    if request.method == "POST" and request.POST.get("reset"):
+        tournament_cache.reset_stats()
+    return JsonResponse(tournament_cache.stats())
+
+@staff_member_required
+def request_timings(request):
+    """JSON per-URL-name timing aggregates (needs MAVBRACKET_SERVER_TIMING; this process only)."""
+    if request.method == "POST" and request.POST.get("reset"):
+        request_metrics.reset()
+    return JsonResponse({"enabled": getattr(settings, "MAVBRACKET_SERVER_TIMING", False), "views": request_metrics.snapshot()})
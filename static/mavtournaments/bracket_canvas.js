@@ -0,0 +1,290 @@
+// static/mavtournaments/bracket_canvas.js
+// Canvas bracket for large tournaments. The columnar bracket JSON is fetched
+// once and kept as flat per-round arrays indexed by slot; every frame draws
+// only the matches inside the viewport, in less detail as boxes shrink.
+// Positions follow services/bracket_layout.py (geometry comes from the page).
+(function () {
+  const canvas = document.getElementById('bracket-canvas');
+  if (!canvas) return;
+  const G = JSON.parse(document.getElementById('bracket-geometry').textContent);
+  const ctx = canvas.getContext('2d');
+  const canEdit = canvas.dataset.canEdit === '1';
+
+  // level of detail, by on-screen box height in CSS pixels
+  const LOD_TEXT = 28;    // names, outlines and "win" hints
+  const LOD_BOX = 3;      // plain boxes and connectors; below: boxes only
+  const MAX_SCALE = 4;
+  const FONT = '12px system-ui, sans-serif';
+  const BOLD = 'bold ' + FONT;
+
+  let rounds = null;          // per round: {id, t1, t2, win: Int32Array, bye: Uint8Array}
+  const names = new Map();    // team id -> name
+  const where = new Map();    // match id -> [round, slot]
+  const fitted = new Map();   // font + name -> name cut to the box width
+  const pending = [];         // stream events that arrived before the data
+  let scale = 1, minScale = 0.01, tx = 0, ty = 0, dpr = 1, queued = false, fittedOnce = false;
+
+  const worldW = 2 * G.margin + Math.max(G.rounds - 1, 0) * G.col_w + G.box_w;
+  const worldH = 2 * G.margin + (Math.max(G.bracket_size / 2, 1) - 1) * G.row_h + G.box_h;
+
+  function matchX(r) { return G.margin + r * G.col_w; }
+  function matchY(r, slot) {
+    const span = 1 << r;
+    return G.margin + Math.floor((slot * span + (span - 1) / 2) * G.row_h);
+  }
+
+  // ---- data ----------------------------------------------------------------
+
+  function emptyRound(n) {
+    return {id: new Int32Array(n), t1: new Int32Array(n), t2: new Int32Array(n),
+            win: new Int32Array(n), bye: new Uint8Array(n)};
+  }
+
+  // columnar bracket_data (services/bracket_serializer.py): team indexes per slot
+  function load(data) {
+    const teamIds = data.teams.id;
+    data.teams.name.forEach((name, i) => names.set(teamIds[i], name));
+    const team = ref => (ref ? teamIds[ref - 1] : 0);
+    rounds = data.rounds.map(function (col, ri) {
+      const n = col.id.length, r = emptyRound(n);
+      let id = 0;
+      for (let s = 0; s < n; s++) {
+        id += col.id[s];
+        r.id[s] = id;
+        r.t1[s] = team(col.team1[s]);
+        r.t2[s] = team(col.team2[s]);
+        r.win[s] = col.winner[s] === 1 ? r.t1[s] : col.winner[s] === 2 ? r.t2[s] : 0;
+        r.bye[s] = col.bye[s];
+        where.set(id, [ri, s]);
+      }
+      return r;
+    });
+    pending.splice(0).forEach(apply);
+    schedule();
+  }
+
+  function apply(ev) {
+    if (!rounds) { pending.push(ev); return; }
+    const at = where.get(ev.match);
+    if (!at) return;
+    const r = rounds[at[0]], s = at[1];
+    if (ev.type === 'advance') {
+      r[ev.slot === 'team1' ? 't1' : 't2'][s] = ev.team;
+      names.set(ev.team, ev.name);
+    } else if (ev.type === 'winner') {
+      r.win[s] = ev.winner || 0;
+    }
+    schedule();
+  }
+
+  // ---- drawing -------------------------------------------------------------
+
+  function fit(name, font) {
+    const key = font + '\u0000' + name;
+    let text = fitted.get(key);
+    if (text === undefined) {
+      const room = G.box_w - (canEdit ? 50 : 20);
+      text = name;
+      ctx.font = font;
+      if (ctx.measureText(text).width > room) {
+        while (text.length > 1 && ctx.measureText(text + '…').width > room) text = text.slice(0, -1);
+        text += '…';
+      }
+      fitted.set(key, text);
+    }
+    return text;
+  }
+
+  function visibleSlots(r, y0, y1) {
+    const span = 1 << r, n = rounds[r].id.length;
+    const lo = Math.floor(((y0 - G.margin - G.box_h) / G.row_h - (span - 1) / 2) / span);
+    const hi = Math.ceil(((y1 - G.margin) / G.row_h - (span - 1) / 2) / span);
+    return [Math.max(lo, 0), Math.min(hi, n - 1)];
+  }
+
+  function connectors(r, lo, hi, path) {
+    if (r + 1 >= rounds.length) return;
+    const x = matchX(r) + G.box_w, mid = x + (G.col_w - G.box_w) / 2, nx = matchX(r + 1);
+    for (let s = lo; s <= hi; s++) {
+      const y = matchY(r, s) + G.box_h / 2, py = matchY(r + 1, s >> 1) + G.box_h / 2;
+      path.moveTo(x, y); path.lineTo(mid, y); path.lineTo(mid, py); path.lineTo(nx, py);
+    }
+  }
+
+  function drawTeam(r, s, key, x, y) {
+    const id = r[key][s];
+    const won = id && r.win[s] === id;
+    const font = won ? BOLD : FONT;
+    ctx.font = font;
+    ctx.fillStyle = id ? '#212529' : '#adb5bd';
+    ctx.fillText(id ? fit(names.get(id) || '?', font) : '—', x + 10, y);
+    if (canEdit && !r.win[s] && r.t1[s] && r.t2[s]) {
+      ctx.font = FONT;
+      ctx.fillStyle = '#0d6efd';
+      ctx.fillText('win', x + G.box_w - 30, y);
+    }
+  }
+
+  function draw() {
+    queued = false;
+    const w = canvas.clientWidth, h = canvas.clientHeight;
+    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+    ctx.clearRect(0, 0, w, h);
+    if (!rounds) return;
+    ctx.setTransform(dpr * scale, 0, 0, dpr * scale, dpr * tx, dpr * ty);
+
+    // viewport in bracket coordinates
+    const x0 = -tx / scale, y0 = -ty / scale, x1 = (w - tx) / scale, y1 = (h - ty) / scale;
+    const boxPx = G.box_h * scale;
+    const rLo = Math.max(0, Math.ceil((x0 - G.margin - G.col_w) / G.col_w));
+    const rHi = Math.min(rounds.length - 1, Math.floor((x1 - G.margin) / G.col_w));
+
+    if (boxPx >= LOD_BOX) {
+      const path = new Path2D();
+      for (let r = rLo; r <= rHi; r++) {
+        const [lo, hi] = visibleSlots(r, y0, y1);
+        connectors(r, lo, hi, path);
+      }
+      ctx.lineWidth = 1 / Math.max(scale, 0.5);
+      ctx.strokeStyle = '#ced4da';
+      ctx.stroke(path);
+    }
+
+    // small boxes: one path per fill colour, filled once
+    const shapes = boxPx < LOD_TEXT ? {open: new Path2D(), bye: new Path2D(), decided: new Path2D()} : null;
+    for (let r = rLo; r <= rHi; r++) {
+      const round = rounds[r], x = matchX(r), span = 1 << r;
+      const [lo, hi] = visibleSlots(r, y0, y1);
+      // when zoomed far out, several boxes share a pixel row: draw one of them
+      const pitch = span * G.row_h * scale;
+      const step = pitch >= 1 ? 1 : Math.ceil(1 / pitch);
+      for (let s = lo - lo % step; s <= hi; s += step) {
+        const y = matchY(r, s);
+        if (shapes) {
+          const kind = round.win[s] ? 'decided' : (round.bye[s] ? 'bye' : 'open');
+          shapes[kind].rect(x, y, G.box_w, Math.max(G.box_h, 1 / scale));
+          continue;
+        }
+        ctx.beginPath();
+        if (ctx.roundRect) ctx.roundRect(x, y, G.box_w, G.box_h, 10); else ctx.rect(x, y, G.box_w, G.box_h);
+        ctx.fillStyle = round.bye[s] ? '#fafafa' : '#f2f2f2';
+        ctx.fill();
+        ctx.lineWidth = 1;
+        ctx.strokeStyle = '#bbbbbb';
+        ctx.stroke();
+        drawTeam(round, s, 't1', x, y + 22);
+        drawTeam(round, s, 't2', x, y + 44);
+      }
+    }
+    if (shapes) {
+      [['open', '#dddddd'], ['bye', '#eeeeee'], ['decided', '#c5d3e0']].forEach(function ([kind, colour]) {
+        ctx.fillStyle = colour;
+        ctx.fill(shapes[kind]);
+      });
+    }
+  }
+
+  function schedule() {
+    if (!queued) { queued = true; requestAnimationFrame(draw); }
+  }
+
+  // ---- view ----------------------------------------------------------------
+
+  function zoomAt(cx, cy, factor) {
+    const next = Math.min(Math.max(scale * factor, minScale), MAX_SCALE);
+    const f = next / scale;
+    tx = cx - (cx - tx) * f;
+    ty = cy - (cy - ty) * f;
+    scale = next;
+    schedule();
+  }
+
+  function resetView() {
+    const w = canvas.clientWidth, h = canvas.clientHeight;
+    scale = Math.min(w / worldW, h / worldH);
+    minScale = scale / 2;
+    tx = (w - worldW * scale) / 2;
+    ty = (h - worldH * scale) / 2;
+    schedule();
+  }
+
+  function resize() {
+    dpr = window.devicePixelRatio || 1;
+    canvas.width = Math.round(canvas.clientWidth * dpr);
+    canvas.height = Math.round(canvas.clientHeight * dpr);
+    if (!fittedOnce && canvas.clientWidth) { fittedOnce = true; resetView(); }
+    schedule();
+  }
+
+  window.zoomIn = () => zoomAt(canvas.clientWidth / 2, canvas.clientHeight / 2, 1.2);
+  window.zoomOut = () => zoomAt(canvas.clientWidth / 2, canvas.clientHeight / 2, 1 / 1.2);
+  window.resetView = resetView;
+
+  // ---- input ---------------------------------------------------------------
+
+  function tap(px, py) {
+    if (!canEdit || !rounds || G.box_h * scale < LOD_TEXT) return;
+    const wx = (px - tx) / scale, wy = (py - ty) / scale;
+    const r = Math.floor((wx - G.margin) / G.col_w);
+    if (r < 0 || r >= rounds.length || wx - matchX(r) > G.box_w) return;
+    const span = 1 << r;
+    const s = Math.round(((wy - G.margin - G.box_h / 2) / G.row_h - (span - 1) / 2) / span);
+    const round = rounds[r], y = matchY(r, s);
+    if (s < 0 || s >= round.id.length || wy < y || wy > y + G.box_h) return;
+    if (round.win[s] || !round.t1[s] || !round.t2[s]) return;
+    const team = wy < y + G.box_h / 2 ? round.t1[s] : round.t2[s];
+    if (confirm(`${names.get(team)} wins R${r + 1}-M${s + 1}?`)) {
+      window.submitWinner(canvas.dataset.winUrlTemplate.replace(/0\/0\/$/, `${round.id[s]}/${team}/`));
+    }
+  }
+
+  const pointers = new Map();
+  let moved = 0, pinch = 0;
+  canvas.addEventListener('pointerdown', e => {
+    canvas.setPointerCapture(e.pointerId);
+    pointers.set(e.pointerId, [e.offsetX, e.offsetY]);
+    moved = pointers.size > 1 ? Infinity : 0;
+    pinch = 0;
+  });
+  canvas.addEventListener('pointermove', e => {
+    const prev = pointers.get(e.pointerId);
+    if (!prev) return;
+    const p = [e.offsetX, e.offsetY];
+    pointers.set(e.pointerId, p);
+    if (pointers.size === 1) {
+      tx += p[0] - prev[0];
+      ty += p[1] - prev[1];
+      moved += Math.abs(p[0] - prev[0]) + Math.abs(p[1] - prev[1]);
+      schedule();
+    } else if (pointers.size === 2) {
+      const [a, b] = [...pointers.values()];
+      const d = Math.hypot(a[0] - b[0], a[1] - b[1]);
+      if (pinch) zoomAt((a[0] + b[0]) / 2, (a[1] + b[1]) / 2, d / pinch);
+      pinch = d;
+    }
+  });
+  function release(e) {
+    if (e.type === 'pointerup' && pointers.size === 1 && moved < 6) tap(e.offsetX, e.offsetY);
+    pointers.delete(e.pointerId);
+    pinch = 0;
+  }
+  canvas.addEventListener('pointerup', release);
+  canvas.addEventListener('pointercancel', release);
+  canvas.addEventListener('wheel', e => {
+    e.preventDefault();
+    zoomAt(e.offsetX, e.offsetY, Math.exp(-e.deltaY * 0.0015));
+  }, {passive: false});
+
+  new ResizeObserver(resize).observe(canvas);
+  window.bracketCanvas = {apply: apply};
+
+  fetch(canvas.dataset.url, {headers: {Accept: 'application/vnd.mavbracket.columnar+json'}})
+    .then(r => r.json())
+    .then(load)
+    .catch(() => {
+      const err = document.createElement('div');
+      err.className = 'alert alert-danger';
+      err.textContent = 'Failed to load bracket data.';
+      canvas.before(err);
+    });
+})();